@@ -46,7 +46,9 @@ bool callback_pool_initialize(int pool_size);
 
 /**
  * @brief Destroi o pool global, liberando toda a memória alocada.
- *        Deve ser chamada durante o desligamento do processador.
+ *        Deve ser chamada durante o desligamento do processador. Os buffers de
+ *        itens ainda em uso (fora da fila de prontos) não são liberados: ficam com
+ *        quem segura o item (ver callback_pool_return_data).
  */
 void callback_pool_destroy();
 
@@ -62,11 +64,53 @@ callback_frame_data_t* callback_pool_get_data(AVFrame* src_frame, int camera_id)
 
 /**
  * @brief Retorna uma estrutura callback_frame_data_t para o pool.
- *        Libera o buffer de dados interno antes de retornar a estrutura ao pool.
+ *        O buffer de dados interno é mantido no pool para o próximo uso do item.
  * 
  * @param data O ponteiro para a estrutura a ser retornada. Seguro chamar com NULL.
+ * @return int 0 se devolvido; -1 se o pool já foi destruído (o buffer data[0] do
+ *         item não foi liberado e passa a ser do chamador, ver
+ *         callback_pool_free_buffer); -2 se o item é inválido ou já estava livre.
  */
-void callback_pool_return_data(callback_frame_data_t* data);
+int callback_pool_return_data(callback_frame_data_t* data);
 
+/**
+ * @brief Devolve vários itens ao pool travando o mutex do pool uma única vez.
+ *
+ * @param items Array de ponteiros a devolver. Entradas NULL são ignoradas.
+ * @param count Número de entradas em items.
+ * @return int Número de itens devolvidos, ou -1 se o pool já foi destruído
+ *         (nenhum item devolvido; os buffers passam a ser do chamador).
+ */
+int callback_pool_return_batch(callback_frame_data_t** items, int count);
+
+/**
+ * @brief Libera o buffer de dados (data[0]) de um item que ainda estava em uso
+ *        quando o pool foi destruído. Seguro chamar com NULL.
+ *
+ * @param buffer Ponteiro data[0] do item.
+ */
+void callback_pool_free_buffer(void* buffer);
+
+/**
+ * @brief Enfileira um item preenchido na fila de frames prontos.
+ *        Se a fila estiver cheia, o item mais antigo é devolvido ao pool (descartado).
+ *
+ * @param data Item obtido com callback_pool_get_data. A posse passa para a fila.
+ */
+void callback_pool_push_ready(callback_frame_data_t* data);
+
+/**
+ * @brief Retira até max_items itens da fila de frames prontos.
+ *        Espera até timeout_ms milissegundos se a fila estiver vazia.
+ *
+ * @param out Array que recebe os ponteiros. O chamador deve devolver cada um com
+ *            callback_pool_return_data.
+ * @param out_headers Opcional (pode ser NULL). Recebe uma cópia de cada item, na
+ *                    mesma ordem de out, em memória contígua.
+ * @param max_items Capacidade de out (e de out_headers).
+ * @param timeout_ms Tempo máximo de espera (0 = não espera).
+ * @return int Número de itens retirados (0 em timeout), -1 se o pool foi destruído.
+ */
+int callback_pool_drain_ready(callback_frame_data_t** out, callback_frame_data_t* out_headers, int max_items, int timeout_ms);
 
 #endif // CALLBACK_UTILS_H 
\ No newline at end of file
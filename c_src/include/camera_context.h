@@ -60,6 +60,7 @@ typedef struct {
     // Flow control fields
     int reconnect_attempts;
     int target_fps;
+    enum AVPixelFormat pixel_format; // Formato entregue ao Python (BGR24 ou YUV420P)
     int64_t target_interval_ns;  // Real-time pacing interval (nanoseconds)
     double estimated_source_fps;
     double frame_skip_accumulator; // Acumulador fracionário para skip preciso
@@ -56,10 +56,14 @@ int processor_initialize(void);
  * @param camera_id O ID (>= 0 e < MAX_CAMERAS) a ser usado para esta câmera, fornecido pelo chamador.
  * @param url URL do stream da câmera.
  * @param status_cb Callback para notificações de status.
- * @param frame_cb Callback para entrega de frames.
+ * @param frame_cb Callback para entrega de frames. Se NULL, os frames vão para a
+ *                 fila de prontos e devem ser consumidos com processor_drain_frames.
  * @param status_cb_user_data Ponteiro opaco para ser passado ao status_cb.
  * @param frame_cb_user_data Ponteiro opaco para ser passado ao frame_cb.
  * @param target_fps Taxa de quadros alvo para o frame_cb (FPS). Se <= 0, usa 1 FPS.
+ * @param pixel_format Formato entregue ao frame_cb: AV_PIX_FMT_BGR24 (3) ou
+ *                     AV_PIX_FMT_YUV420P (0, sem conversão sws quando o decoder já
+ *                     produz YUV420P). Valores não suportados caem em BGR24.
  * @return int 0 em sucesso, < 0 em erro.
  *         Possíveis erros: -1 (não inicializado), -3 (URL inválida),
  *                          -4 (ID inválido ou já em uso), -5 (erro thread).
@@ -70,7 +74,8 @@ int processor_add_camera(int camera_id,
                          frame_callback_t frame_cb,
                          void* status_cb_user_data,
                          void* frame_cb_user_data,
-                         int target_fps);
+                         int target_fps,
+                         int pixel_format);
 
 /**
  * @brief Solicita a parada de UMA câmera específica.
@@ -89,4 +94,19 @@ int processor_stop_camera(int camera_id);
  */
 int processor_shutdown(void);
 
+/**
+ * @brief Retira em lote os frames prontos de câmeras registradas sem frame_cb.
+ *        Permite que um único consumidor (thread Python) processe os frames sem
+ *        uma transição C -> Python por frame.
+ *
+ * @param out_frames Array que recebe os ponteiros. Cada um DEVE ser devolvido com
+ *                   callback_pool_return_data() após o uso.
+ * @param out_headers Opcional (pode ser NULL). Recebe cópias contíguas das estruturas,
+ *                    para leitura em lote dos metadados sem acessar cada ponteiro.
+ * @param max_frames Capacidade de out_frames (e de out_headers).
+ * @param timeout_ms Tempo máximo de espera se não houver frames (0 = não espera).
+ * @return int Número de frames retirados (0 em timeout), -1 se o processador foi desligado.
+ */
+int processor_drain_frames(callback_frame_data_t** out_frames, callback_frame_data_t* out_headers, int max_frames, int timeout_ms);
+
 #endif // CAMERA_PROCESSOR_H 
@@ -6,7 +6,10 @@
 #include <string.h> // Para memset, memcpy
 #include <pthread.h> // Para mutex
 #include <stdbool.h>
+#include <errno.h>   // Para ETIMEDOUT
+#include <time.h>    // Para clock_gettime
 #include <libavutil/imgutils.h> // Para av_image_get_buffer_size
+#include <libavutil/mem.h>      // Para av_malloc/av_free (buffers alinhados)
 #include <libavcodec/avcodec.h> // Para AV_PIX_FMT_BGR24 (idealmente viria de um header comum)
 #include <libavutil/frame.h>   // Para AVFrame
 
@@ -26,6 +29,23 @@ static int g_pool_free_count = 0;
 static pthread_mutex_t g_pool_mutex = PTHREAD_MUTEX_INITIALIZER;
 static bool g_pool_initialized = false;
 
+// Buffer de imagem de cada item, mantido entre usos (não é liberado ao devolver
+// o item). Como a lista de livres é LIFO, só os itens realmente usados em pico
+// retêm memória, e em regime estável nenhum frame faz malloc/free.
+static uint8_t** g_pool_buffers = NULL;
+static size_t* g_pool_capacity = NULL;
+
+// --- Fila de frames prontos (consumida pelo Python via processor_drain_frames) ---
+#define FRAME_READY_QUEUE_SIZE (MAX_CAMERAS * 2)
+
+static callback_frame_data_t* g_ready_queue[FRAME_READY_QUEUE_SIZE];
+static int g_ready_head = 0;  // Próximo item a ser consumido
+static int g_ready_count = 0;
+static bool g_ready_closed = false; // true após destroy: drains retornam imediatamente
+static int g_ready_waiters = 0; // Consumidores bloqueados em pthread_cond_timedwait
+static pthread_mutex_t g_ready_mutex = PTHREAD_MUTEX_INITIALIZER;
+static pthread_cond_t g_ready_cond = PTHREAD_COND_INITIALIZER;
+
 // --- Implementação das Funções Públicas --- 
 
 bool callback_pool_initialize(int pool_size) {
@@ -60,6 +80,24 @@ bool callback_pool_initialize(int pool_size) {
         return false;
     }
 
+    // Buffers reutilizáveis por item (alocados sob demanda)
+    g_pool_buffers = (uint8_t**)calloc(g_pool_size, sizeof(uint8_t*));
+    g_pool_capacity = (size_t*)calloc(g_pool_size, sizeof(size_t));
+    if (!g_pool_buffers || !g_pool_capacity) {
+        log_message(LOG_LEVEL_ERROR, "[Callback Pool] Falha ao alocar tabela de buffers.");
+        free(g_pool_buffers);
+        g_pool_buffers = NULL;
+        free(g_pool_capacity);
+        g_pool_capacity = NULL;
+        free(g_pool_indices);
+        g_pool_indices = NULL;
+        free(g_callback_pool);
+        g_callback_pool = NULL;
+        g_pool_size = 0;
+        pthread_mutex_unlock(&g_pool_mutex);
+        return false;
+    }
+
     // Preencher o array de índices (0, 1, 2, ...)
     for (int i = 0; i < g_pool_size; ++i) {
         g_pool_indices[i] = i;
@@ -68,6 +106,12 @@ bool callback_pool_initialize(int pool_size) {
     g_pool_free_count = g_pool_size;
     g_pool_initialized = true;
 
+    pthread_mutex_lock(&g_ready_mutex);
+    g_ready_head = 0;
+    g_ready_count = 0;
+    g_ready_closed = false;
+    pthread_mutex_unlock(&g_ready_mutex);
+
     log_message(LOG_LEVEL_INFO, "[Callback Pool] Inicializado com sucesso.");
     pthread_mutex_unlock(&g_pool_mutex);
     return true;
@@ -83,13 +127,38 @@ void callback_pool_destroy() {
 
     log_message(LOG_LEVEL_INFO, "[Callback Pool] Destruindo pool...");
 
-    // Liberar buffers internos que possam ter vazado (embora não devesse acontecer)
+    // Fechar a fila de prontos e acordar quem estiver esperando. Itens ainda
+    // enfileirados não têm dono fora do C: marcados livres, seus buffers são
+    // liberados junto com os demais abaixo.
+    pthread_mutex_lock(&g_ready_mutex);
+    for (int i = 0; i < g_ready_count; ++i) {
+        g_ready_queue[(g_ready_head + i) % FRAME_READY_QUEUE_SIZE]->ref_count = 0;
+    }
+    g_ready_head = 0;
+    g_ready_count = 0;
+    g_ready_closed = true;
+    pthread_cond_broadcast(&g_ready_cond);
+    pthread_mutex_unlock(&g_ready_mutex);
+
+    // Liberar os buffers reutilizáveis. Itens não devolvidos (ref_count != 0)
+    // ainda estão em uso pelo Python (ex.: views sem cópia guardadas pelo usuário):
+    // o buffer deles não é liberado aqui e passa a ser do dono, que o libera com
+    // callback_pool_free_buffer quando callback_pool_return_data retornar -1.
+    int outstanding = 0;
     for (int i = 0; i < g_pool_size; ++i) {
-        if (g_callback_pool[i].data[0]) {
-            log_message(LOG_LEVEL_WARNING, "[Callback Pool] Buffer interno (%d) não retornado, liberando...", i);
-            free(g_callback_pool[i].data[0]);
+        if (g_callback_pool[i].ref_count != 0) {
+            outstanding++;
+            continue;
         }
+        av_free(g_pool_buffers[i]);
+    }
+    if (outstanding > 0) {
+        log_message(LOG_LEVEL_WARNING, "[Callback Pool] %d item(ns) ainda em uso; buffers ficam com o dono.", outstanding);
     }
+    free(g_pool_buffers);
+    g_pool_buffers = NULL;
+    free(g_pool_capacity);
+    g_pool_capacity = NULL;
 
     free(g_callback_pool);
     g_callback_pool = NULL;
@@ -104,6 +173,19 @@ void callback_pool_destroy() {
     // pthread_mutex_destroy(&g_pool_mutex); // Opcional, se for estático não precisa
 }
 
+// Garante que o item tenha um buffer de pelo menos 'size' bytes, reaproveitando o
+// anterior quando couber. Não precisa de lock: o item pertence a um único dono.
+static uint8_t* pool_item_buffer(int data_index, size_t size) {
+    if (g_pool_capacity[data_index] < size) {
+        // av_malloc alinha para SIMD (até 64 bytes com AVX-512): memcpy/sws e a
+        // cópia no Python leem a partir de um início alinhado
+        av_free(g_pool_buffers[data_index]);
+        g_pool_buffers[data_index] = (uint8_t*)av_malloc(size);
+        g_pool_capacity[data_index] = g_pool_buffers[data_index] ? size : 0;
+    }
+    return g_pool_buffers[data_index];
+}
+
 callback_frame_data_t* callback_pool_get_data(AVFrame* src_frame, int camera_id) {
     if (!g_pool_initialized) {
         log_message(LOG_LEVEL_ERROR, "[Callback Pool] Pool não inicializado ao tentar obter dados.");
@@ -113,7 +195,8 @@ callback_frame_data_t* callback_pool_get_data(AVFrame* src_frame, int camera_id)
         log_message(LOG_LEVEL_ERROR, "[Callback Pool] Tentativa de obter dados a partir de AVFrame nulo.");
         return NULL;
     }
-    if (src_frame->format != AV_PIX_FMT_BGR24 || src_frame->width <= 0 || src_frame->height <= 0) {
+    bool is_yuv420p = (src_frame->format == AV_PIX_FMT_YUV420P);
+    if ((src_frame->format != AV_PIX_FMT_BGR24 && !is_yuv420p) || src_frame->width <= 0 || src_frame->height <= 0) {
          log_message(LOG_LEVEL_WARNING, "[Callback Pool] AVFrame inválido (formato/dims) fornecido.");
          return NULL;
     }
@@ -154,6 +237,36 @@ callback_frame_data_t* callback_pool_get_data(AVFrame* src_frame, int camera_id)
     cb_data->camera_id = camera_id;
     // cb_data->ref_count já é 1
 
+    if (is_yuv420p) {
+        // --- Cópia YUV420P: os três planos empacotados em um único buffer (data[0]) ---
+        int yuv_size = av_image_get_buffer_size(AV_PIX_FMT_YUV420P, cb_data->width, cb_data->height, 1);
+        size_t buffer_size = (yuv_size > 0) ? (size_t)yuv_size : 0;
+        uint8_t* buffer = (buffer_size > 0) ? pool_item_buffer(data_index, buffer_size) : NULL;
+        if (!buffer) {
+            log_message(LOG_LEVEL_ERROR, "[Callback Pool Item %d] Falha ao alocar %zu bytes para cópia YUV420P.", data_index, buffer_size);
+            callback_pool_return_data(cb_data);
+            return NULL;
+        }
+        if (av_image_copy_to_buffer(buffer, (int)buffer_size,
+                                    (const uint8_t* const*)src_frame->data, src_frame->linesize,
+                                    AV_PIX_FMT_YUV420P, cb_data->width, cb_data->height, 1) < 0) {
+            log_message(LOG_LEVEL_ERROR, "[Callback Pool Item %d] Falha ao copiar planos YUV420P.", data_index);
+            callback_pool_return_data(cb_data);
+            return NULL;
+        }
+        int chroma_w = (cb_data->width + 1) / 2;
+        int chroma_h = (cb_data->height + 1) / 2;
+        cb_data->data[0] = buffer;
+        cb_data->data[1] = buffer + (size_t)cb_data->width * cb_data->height;
+        cb_data->data[2] = cb_data->data[1] + (size_t)chroma_w * chroma_h;
+        cb_data->linesize[0] = cb_data->width;
+        cb_data->linesize[1] = chroma_w;
+        cb_data->linesize[2] = chroma_w;
+        // Apenas data[0] é dono da memória; data[1]/data[2] apontam para dentro dele
+        cb_data->data_buffer_size[0] = buffer_size;
+        return cb_data;
+    }
+
     // --- Alocação e Cópia do Buffer BGR (Plano 0) ---
     int plane_index = 0;
     if (!src_frame->data[plane_index] || src_frame->linesize[plane_index] <= 0) {
@@ -175,8 +288,8 @@ callback_frame_data_t* callback_pool_get_data(AVFrame* src_frame, int camera_id)
         return NULL;
     }
 
-    // Alocar memória para a CÓPIA
-    cb_data->data[plane_index] = (uint8_t*)malloc(cb_data->data_buffer_size[plane_index]);
+    // Buffer para a CÓPIA (reaproveitado do uso anterior do item quando couber)
+    cb_data->data[plane_index] = pool_item_buffer(data_index, cb_data->data_buffer_size[plane_index]);
     if (!cb_data->data[plane_index]) {
         log_message(LOG_LEVEL_ERROR, "[Callback Pool Item %d] Falha ao alocar %zu bytes para cópia BGR.", data_index, cb_data->data_buffer_size[plane_index]);
         callback_pool_return_data(cb_data); 
@@ -206,62 +319,89 @@ callback_frame_data_t* callback_pool_get_data(AVFrame* src_frame, int camera_id)
     return cb_data;
 }
 
-void callback_pool_return_data(callback_frame_data_t* data) {
-    if (!g_pool_initialized) {
-        // Se pool não inicializado, apenas libera memória se existir
-        if (data && data->data[0]) free(data->data[0]);
-        // Não tentar liberar a estrutura 'data' pois não veio do pool
-        return; 
-    }
-    if (!data) {
-        return; // Seguro chamar com NULL
-    }
-
-    // Verificar se este ponteiro realmente pertence ao nosso pool (verificação opcional)
-    // int data_index = data - g_callback_pool; // Aritmética de ponteiros
-    // if (data_index < 0 || data_index >= g_pool_size) {
-    //     log_message(LOG_LEVEL_ERROR, "[Callback Pool] Tentativa de retornar ponteiro inválido ao pool!");
-    //     // Liberar buffer interno por segurança, mas não retornar ao pool
-    //     if(data->data[0]) free(data->data[0]);
-    //     return;
-    // }
-    // if (data->ref_count == 0) {
-    //     log_message(LOG_LEVEL_WARNING, "[Callback Pool] Tentativa de retornar item (%d) já livre!", data_index);
-    //     return; // Já está no pool
-    // }
-
-    // --- Liberar recursos internos (buffer de imagem) --- 
-    int plane_index = 0;
-    if (data->data[plane_index]) {
-        // log_message(LOG_LEVEL_TRACE, "[Callback Pool] Liberando buffer interno do item %ld.", data - g_callback_pool);
-        free(data->data[plane_index]);
-        data->data[plane_index] = NULL;
-        data->linesize[plane_index] = 0;
-        data->data_buffer_size[plane_index] = 0;
-    }
-    // Limpar outros campos por segurança?
+// Solta as referências ao buffer de imagem de um item antes de devolvê-lo.
+// O buffer em si continua em g_pool_buffers para o próximo uso do item.
+// Planos 1/2 (YUV420P) apontam para dentro do buffer do plano 0.
+static void pool_item_reset(callback_frame_data_t* data) {
+    memset(data->data, 0, sizeof(data->data));
+    memset(data->linesize, 0, sizeof(data->linesize));
+    memset(data->data_buffer_size, 0, sizeof(data->data_buffer_size));
     data->pts = 0;
     data->width = 0;
     data->height = 0;
-    
-    // IMPORTANTE: Adicionar log para debug e manter o camera_id
-    log_message(LOG_LEVEL_INFO, "[Callback Pool] Retornando item com camera_id=%d para o pool", data->camera_id);
-    // NÃO zerar o camera_id aqui! Este pode ser o problema
-    // data->camera_id = 0; // <- Remover ou comentar se existe
+}
 
-    // --- Retornar ao pool --- 
-    pthread_mutex_lock(&g_pool_mutex);
+// Recoloca o item na lista de livres. Chamar com g_pool_mutex travado.
+static void pool_push_free_locked(callback_frame_data_t* data) {
     if (g_pool_free_count < g_pool_size) {
         int data_index = data - g_callback_pool; // Calcular índice
         g_pool_indices[g_pool_free_count] = data_index; // Adiciona índice à lista de livres
         g_pool_free_count++;
         data->ref_count = 0; // Marcar como livre
-        // log_message(LOG_LEVEL_TRACE, "[Callback Pool] Item %d retornado ao pool.", data_index);
     } else {
         // Isso não deveria acontecer se a lógica estiver correta
         log_message(LOG_LEVEL_ERROR, "[Callback Pool] Tentativa de retornar item para pool cheio!");
     }
+}
+
+// Confere se o item pertence ao pool atual e está em uso. Chamar com g_pool_mutex travado.
+static bool pool_item_in_use_locked(const callback_frame_data_t* data) {
+    return data >= g_callback_pool && data < g_callback_pool + g_pool_size && data->ref_count != 0;
+}
+
+int callback_pool_return_data(callback_frame_data_t* data) {
+    if (!data) {
+        return -2; // Seguro chamar com NULL
+    }
+
+    // Checagem e reset sob o mutex: callback_pool_destroy não pode rodar no meio
+    pthread_mutex_lock(&g_pool_mutex);
+    if (!g_pool_initialized) {
+        // Pool destruído com o item em uso: o buffer não foi liberado e é do chamador
+        pthread_mutex_unlock(&g_pool_mutex);
+        return -1;
+    }
+    if (!pool_item_in_use_locked(data)) {
+        pthread_mutex_unlock(&g_pool_mutex);
+        log_message(LOG_LEVEL_ERROR, "[Callback Pool] Tentativa de retornar item inválido ou já livre (%p).", (void*)data);
+        return -2;
+    }
+    pool_item_reset(data);
+    pool_push_free_locked(data);
+    pthread_mutex_unlock(&g_pool_mutex);
+    return 0;
+}
+
+int callback_pool_return_batch(callback_frame_data_t** items, int count) {
+    if (!items || count <= 0) {
+        return 0;
+    }
+    int returned = 0;
+    // Um único lock para o lote inteiro
+    pthread_mutex_lock(&g_pool_mutex);
+    if (!g_pool_initialized) {
+        pthread_mutex_unlock(&g_pool_mutex);
+        return -1;
+    }
+    for (int i = 0; i < count; i++) {
+        if (!items[i]) {
+            continue;
+        }
+        if (!pool_item_in_use_locked(items[i])) {
+            log_message(LOG_LEVEL_ERROR, "[Callback Pool] Item inválido ou já livre no lote (%p).", (void*)items[i]);
+            continue;
+        }
+        pool_item_reset(items[i]);
+        pool_push_free_locked(items[i]);
+        returned++;
+    }
     pthread_mutex_unlock(&g_pool_mutex);
+    log_message(LOG_LEVEL_DEBUG, "[Callback Pool] Lote de %d itens retornado ao pool", returned);
+    return returned;
+}
+
+void callback_pool_free_buffer(void* buffer) {
+    av_free(buffer);
 }
 
 callback_frame_data_t* callback_utils_create_data(AVFrame* frame, int camera_id) {
@@ -336,4 +476,82 @@ void callback_utils_free_data(callback_frame_data_t* data) {
     // Liberar a estrutura principal
     free(data);
     log_message(LOG_LEVEL_TRACE, "[Callback Utils] Estrutura liberada.");
-} 
\ No newline at end of file
+} 
+
+void callback_pool_push_ready(callback_frame_data_t* data) {
+    if (!data) {
+        return;
+    }
+    callback_frame_data_t* dropped = NULL;
+
+    pthread_mutex_lock(&g_ready_mutex);
+    if (g_ready_closed) {
+        pthread_mutex_unlock(&g_ready_mutex);
+        callback_pool_return_data(data);
+        return;
+    }
+    if (g_ready_count == FRAME_READY_QUEUE_SIZE) {
+        // Fila cheia: descartar o mais antigo para manter a latência baixa
+        dropped = g_ready_queue[g_ready_head];
+        g_ready_head = (g_ready_head + 1) % FRAME_READY_QUEUE_SIZE;
+        g_ready_count--;
+    }
+    g_ready_queue[(g_ready_head + g_ready_count) % FRAME_READY_QUEUE_SIZE] = data;
+    g_ready_count++;
+    // Só acordar se houver consumidor dormindo: com o Python drenando em lote, a
+    // maioria dos pushes chega enquanto ele ainda processa o lote anterior e não
+    // precisa de syscall (futex) nem troca de contexto.
+    if (g_ready_waiters > 0) {
+        pthread_cond_signal(&g_ready_cond);
+    }
+    pthread_mutex_unlock(&g_ready_mutex);
+
+    if (dropped) {
+        log_message(LOG_LEVEL_WARNING, "[Callback Pool] Fila de prontos cheia. Frame da câmera %d descartado.", dropped->camera_id);
+        callback_pool_return_data(dropped);
+    }
+}
+
+int callback_pool_drain_ready(callback_frame_data_t** out, callback_frame_data_t* out_headers, int max_items, int timeout_ms) {
+    if (!out || max_items <= 0) {
+        return 0;
+    }
+
+    pthread_mutex_lock(&g_ready_mutex);
+    if (g_ready_count == 0 && !g_ready_closed && timeout_ms > 0) {
+        struct timespec deadline;
+        clock_gettime(CLOCK_REALTIME, &deadline);
+        deadline.tv_sec += timeout_ms / 1000;
+        deadline.tv_nsec += (long)(timeout_ms % 1000) * 1000000L;
+        if (deadline.tv_nsec >= 1000000000L) {
+            deadline.tv_sec++;
+            deadline.tv_nsec -= 1000000000L;
+        }
+        g_ready_waiters++;
+        while (g_ready_count == 0 && !g_ready_closed) {
+            if (pthread_cond_timedwait(&g_ready_cond, &g_ready_mutex, &deadline) == ETIMEDOUT) {
+                break;
+            }
+        }
+        g_ready_waiters--;
+    }
+
+    if (g_ready_closed) {
+        pthread_mutex_unlock(&g_ready_mutex);
+        return -1;
+    }
+
+    int n = 0;
+    while (n < max_items && g_ready_count > 0) {
+        out[n] = g_ready_queue[g_ready_head];
+        if (out_headers) {
+            // Cópia contígua dos cabeçalhos: o Python lê o lote inteiro de uma vez
+            out_headers[n] = *out[n];
+        }
+        n++;
+        g_ready_head = (g_ready_head + 1) % FRAME_READY_QUEUE_SIZE;
+        g_ready_count--;
+    }
+    pthread_mutex_unlock(&g_ready_mutex);
+    return n;
+}
@@ -251,7 +251,8 @@ int processor_add_camera(int camera_id,
                          frame_callback_t frame_cb,
                          void* status_cb_user_data,
                          void* frame_cb_user_data,
-                         int target_fps)
+                         int target_fps,
+                         int pixel_format)
 {
     pthread_mutex_lock(&contexts_mutex);
     if (!g_processor_initialized) {
@@ -304,6 +305,12 @@ int processor_add_camera(int camera_id,
     ctx->status_cb_user_data = status_cb_user_data;
     ctx->frame_cb_user_data = frame_cb_user_data;
     ctx->target_fps = (target_fps <= 0) ? 1 : target_fps;
+    if (pixel_format == AV_PIX_FMT_YUV420P || pixel_format == AV_PIX_FMT_BGR24) {
+        ctx->pixel_format = (enum AVPixelFormat)pixel_format;
+    } else {
+        log_message(LOG_LEVEL_WARNING, "[Processor API] Formato de pixel %d não suportado para ID %d. Usando BGR24.", pixel_format, camera_id);
+        ctx->pixel_format = AV_PIX_FMT_BGR24;
+    }
     ctx->video_stream_index = -1;
     ctx->reconnect_attempts = 0;
     ctx->frame_skip_count = 1; 
@@ -554,4 +561,9 @@ int processor_shutdown(void) {
     pthread_mutex_unlock(&contexts_mutex);
     
     return 0;
-}
\ No newline at end of file
+}
+
+int processor_drain_frames(callback_frame_data_t** out_frames, callback_frame_data_t* out_headers, int max_frames, int timeout_ms) {
+    // Sem contexts_mutex: a espera pode ser longa e a fila tem seu próprio lock
+    return callback_pool_drain_ready(out_frames, out_headers, max_frames, timeout_ms);
+}
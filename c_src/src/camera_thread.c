@@ -5,6 +5,10 @@
 #include "callback_utils.h"
 #include "camera_context.h"
 
+#ifdef HAVE_LIBYUV
+#include <libyuv.h> // I420ToRGB24
+#endif
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h> 
@@ -67,6 +71,7 @@ static void cleanup_ffmpeg_resources(camera_thread_context_t* ctx) { // Recebe c
 }
 
 // Atualiza estado e chama callback de status
+// As mensagens fixas por estado são espelhadas em _KNOWN_STATUS_MESSAGES (processor.py)
 static void update_camera_status(camera_thread_context_t* ctx, camera_state_t new_state, const char* message) { // Recebe ctx
     if (!ctx) return;
     if (ctx->state == new_state /* && comparar mensagem se relevante */) { 
@@ -403,7 +408,10 @@ static bool allocate_packets_and_frames(camera_thread_context_t* ctx) {
 }
 
 
-// Converte o frame decodificado para BGR e chama o callback Python.
+// Converte o frame decodificado para o formato de saída (BGR24 ou YUV420P) e chama o callback Python.
+// Quando o formato pedido é YUV420P e o decoder já entrega YUV420P, o sws_scale é pulado.
+// YUVJ420P (faixa completa, ex.: MJPEG) passa pelo sws_scale, que converte para a faixa
+// limitada esperada por cv2.COLOR_YUV2BGR_I420.
 static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* frame_to_convert) {
     if (!ctx) return false;
     int ret = 0;
@@ -428,6 +436,17 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
         return false;
     }
 
+    enum AVPixelFormat out_fmt = ctx->pixel_format;
+    AVFrame* frame_out = ctx->frame_bgr;
+
+    // --- Passagem direta sem conversão ---
+    if (out_fmt == AV_PIX_FMT_YUV420P && frame_to_convert->format == AV_PIX_FMT_YUV420P &&
+        frame_to_convert->color_range != AVCOL_RANGE_JPEG) {
+        log_message(LOG_LEVEL_TRACE, "[Dispatch] Frame já em YUV420P, pulando sws_scale.");
+        frame_out = frame_to_convert;
+        goto dispatch_callback;
+    }
+
     // --- Configuração/Reconfiguração do SwsContext --- 
     log_message(LOG_LEVEL_TRACE, "[Dispatch] Verificando/Configurando SwsContext...");
     if (!ctx->sws_ctx || ctx->sws_ctx_width != frame_to_convert->width || 
@@ -435,11 +454,11 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
         ctx->sws_ctx_in_fmt != frame_to_convert->format)
     {
         if(ctx->sws_ctx) sws_freeContext(ctx->sws_ctx);
-        log_message(LOG_LEVEL_DEBUG, "[SWS] Criando/Recriando SwsContext: %dx%d (%d) -> %dx%d (BGR24)",
+        log_message(LOG_LEVEL_DEBUG, "[SWS] Criando/Recriando SwsContext: %dx%d (%d) -> %dx%d (%d)",
                     frame_to_convert->width, frame_to_convert->height, frame_to_convert->format,
-                    frame_to_convert->width, frame_to_convert->height, AV_PIX_FMT_BGR24);
+                    frame_to_convert->width, frame_to_convert->height, out_fmt);
         ctx->sws_ctx = sws_getContext(frame_to_convert->width, frame_to_convert->height, frame_to_convert->format, 
-                                  frame_to_convert->width, frame_to_convert->height, AV_PIX_FMT_BGR24,
+                                  frame_to_convert->width, frame_to_convert->height, out_fmt,
                                   SWS_FAST_BILINEAR, NULL, NULL, NULL);
         if (!ctx->sws_ctx) { 
             log_message(LOG_LEVEL_ERROR, "[SWS] Falha ao criar SwsContext"); 
@@ -457,7 +476,7 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
         // Se dimensões/format não mudaram, tentar reutilizar buffer
         if (ctx->frame_bgr->width == frame_to_convert->width &&
             ctx->frame_bgr->height == frame_to_convert->height &&
-            ctx->frame_bgr->format == AV_PIX_FMT_BGR24) {
+            ctx->frame_bgr->format == out_fmt) {
             if (av_frame_make_writable(ctx->frame_bgr) < 0) {
                 av_frame_unref(ctx->frame_bgr);
             }
@@ -468,7 +487,7 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
 
     ctx->frame_bgr->width = frame_to_convert->width;
     ctx->frame_bgr->height = frame_to_convert->height;
-    ctx->frame_bgr->format = AV_PIX_FMT_BGR24;
+    ctx->frame_bgr->format = out_fmt;
     ctx->frame_bgr->pts = frame_to_convert->pts; 
     log_message(LOG_LEVEL_TRACE, "[Dispatch] Garantindo buffer BGR...");
     if (!ctx->frame_bgr->data[0]) {
@@ -506,16 +525,36 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
                 ctx->frame_bgr->height // Adicione esta linha para completar o log
                 );
     
-    log_message(LOG_LEVEL_TRACE, "[Dispatch] Executando sws_scale...");
-    sws_scale(ctx->sws_ctx, 
-              (const uint8_t* const*)frame_to_convert->data, 
-              frame_to_convert->linesize, 
-              0, 
-              frame_to_convert->height, 
-              ctx->frame_bgr->data, 
-              ctx->frame_bgr->linesize);
-    log_message(LOG_LEVEL_TRACE, "[Dispatch] sws_scale concluído.");
+#ifdef HAVE_LIBYUV
+    // YUV420P (faixa limitada, BT.601) -> BGR24: libyuv usa SIMD e é mais rápida que o sws_scale.
+    // O "RGB24" da libyuv tem ordem B,G,R na memória, o mesmo layout do AV_PIX_FMT_BGR24.
+    // Frames YUV420P marcados como faixa completa ficam com o sws_scale.
+    if (frame_to_convert->format == AV_PIX_FMT_YUV420P && frame_to_convert->color_range != AVCOL_RANGE_JPEG &&
+        out_fmt == AV_PIX_FMT_BGR24) {
+        log_message(LOG_LEVEL_TRACE, "[Dispatch] Executando I420ToRGB24 (libyuv)...");
+        if (I420ToRGB24(frame_to_convert->data[0], frame_to_convert->linesize[0],
+                        frame_to_convert->data[1], frame_to_convert->linesize[1],
+                        frame_to_convert->data[2], frame_to_convert->linesize[2],
+                        ctx->frame_bgr->data[0], ctx->frame_bgr->linesize[0],
+                        frame_to_convert->width, frame_to_convert->height) != 0) {
+            log_message(LOG_LEVEL_ERROR, "[Dispatch] I420ToRGB24 falhou.");
+            goto dispatch_cleanup_and_fail;
+        }
+    } else
+#endif
+    {
+        log_message(LOG_LEVEL_TRACE, "[Dispatch] Executando sws_scale...");
+        sws_scale(ctx->sws_ctx, 
+                  (const uint8_t* const*)frame_to_convert->data, 
+                  frame_to_convert->linesize, 
+                  0, 
+                  frame_to_convert->height, 
+                  ctx->frame_bgr->data, 
+                  ctx->frame_bgr->linesize);
+        log_message(LOG_LEVEL_TRACE, "[Dispatch] sws_scale concluído.");
+    }
 
+dispatch_callback: ;
     // --- Callback Python --- 
     callback_frame_data_t* cb_data = NULL;
     // Capturar o callback e user_data localmente para thread-safety se forem modificados externamente
@@ -524,9 +563,9 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
 
     if (local_frame_cb) {
         // Logar o PTS ANTES de criar/enviar
-        log_message(LOG_LEVEL_INFO, "[Dispatch ID %d] Preparando para enviar frame com PTS: %ld", ctx->camera_id, ctx->frame_bgr->pts);
+        log_message(LOG_LEVEL_INFO, "[Dispatch ID %d] Preparando para enviar frame com PTS: %ld", ctx->camera_id, frame_out->pts);
         log_message(LOG_LEVEL_TRACE, "[Dispatch] Criando dados para callback Python...");
-        cb_data = callback_pool_get_data(ctx->frame_bgr, ctx->camera_id); 
+        cb_data = callback_pool_get_data(frame_out, ctx->camera_id); 
         if (cb_data) {
             log_message(LOG_LEVEL_TRACE, "[Dispatch] Dados criados. Chamando callback Python...");
             local_frame_cb(cb_data, local_user_data); 
@@ -537,8 +576,16 @@ static bool convert_and_dispatch_frame(camera_thread_context_t* ctx, AVFrame* fr
         } else { 
             log_message(LOG_LEVEL_ERROR, "[Dispatch ID %d] Falha ao criar dados de callback (cb_data nulo).", ctx->camera_id); 
         }
-    } else { 
-        log_message(LOG_LEVEL_TRACE, "[Dispatch] Callback Python não definido."); 
+    } else {
+        // Sem callback: enfileirar para o consumidor de processor_drain_frames
+        cb_data = callback_pool_get_data(frame_out, ctx->camera_id);
+        if (cb_data) {
+            callback_pool_push_ready(cb_data);
+            frame_sent = true;
+            clock_gettime(CLOCK_MONOTONIC, &ctx->last_frame_sent_time);
+        } else {
+            log_message(LOG_LEVEL_ERROR, "[Dispatch ID %d] Falha ao criar dados de frame (cb_data nulo).", ctx->camera_id);
+        }
     }
 
 dispatch_cleanup:
@@ -1,13 +1,17 @@
-from .c_interface import (
+from .constants import (
     STATUS_STOPPED, STATUS_CONNECTING, STATUS_CONNECTED, STATUS_DISCONNECTED,
-    STATUS_ERROR
+    STATUS_ERROR, AV_PIX_FMT_BGR24, AV_PIX_FMT_YUV420P
 )
 from .processor import CameraProcessor
-from .callbacks import FrameCallback, StatusCallback, SimpleFrameCallback, SimpleStatusCallback
+from .callbacks import (
+    FrameCallback, StatusCallback, SimpleFrameCallback, SimpleStatusCallback,
+    BGRFrameCallback, RawBufferFrameCallback
+)
 
 __all__ = [
     'CameraProcessor',
     'STATUS_STOPPED', 'STATUS_CONNECTING', 'STATUS_CONNECTED', 'STATUS_DISCONNECTED',
-    'STATUS_ERROR',
-    'FrameCallback', 'StatusCallback', 'SimpleFrameCallback', 'SimpleStatusCallback'
+    'STATUS_ERROR', 'AV_PIX_FMT_BGR24', 'AV_PIX_FMT_YUV420P',
+    'FrameCallback', 'StatusCallback', 'SimpleFrameCallback', 'SimpleStatusCallback',
+    'BGRFrameCallback', 'RawBufferFrameCallback'
 ] 
\ No newline at end of file
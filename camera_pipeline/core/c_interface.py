@@ -1,100 +1,129 @@
 import ctypes
 import ctypes.util
+import functools
 import logging
 import os
 import platform
+import struct
 import sys
+import threading
 
 logger = logging.getLogger(__name__)
 
-# Constantes de nível de log (espelho das definições C)
-LOG_LEVEL_QUIET = -8
-LOG_LEVEL_PANIC = 0
-LOG_LEVEL_FATAL = 8
-LOG_LEVEL_ERROR = 16
-LOG_LEVEL_WARNING = 24
-LOG_LEVEL_INFO = 32
-LOG_LEVEL_VERBOSE = 40
-LOG_LEVEL_DEBUG = 48
-LOG_LEVEL_TRACE = 56
-
-# Constantes de formato de pixel (espelho das definições C)
-AV_PIX_FMT_NONE = -1
-AV_PIX_FMT_YUV420P = 0
-AV_PIX_FMT_YUYV422 = 1
-AV_PIX_FMT_RGB24 = 2
-AV_PIX_FMT_BGR24 = 3
-# Adicione outros formatos conforme necessário
-
-# Constantes de status da câmera (espelho das definições C)
-STATUS_STOPPED = 0
-STATUS_CONNECTING = 1
-STATUS_CONNECTED = 2
-STATUS_DISCONNECTED = 3
-STATUS_ERROR = 4
-STATUS_RECONNECTING = 5
-STATUS_BUFFERING = 6
-STATUS_MAX_SLOTS = 7
-
-# Variável global para armazenar a biblioteca carregada
-C_LIBRARY = None
-IS_INTERFACE_READY = False
+# Constantes reexportadas para compatibilidade com código que importa de c_interface
+from .constants import (
+    LOG_LEVEL_QUIET, LOG_LEVEL_PANIC, LOG_LEVEL_FATAL, LOG_LEVEL_ERROR,
+    LOG_LEVEL_WARNING, LOG_LEVEL_INFO, LOG_LEVEL_VERBOSE, LOG_LEVEL_DEBUG,
+    LOG_LEVEL_TRACE,
+    AV_PIX_FMT_NONE, AV_PIX_FMT_YUV420P, AV_PIX_FMT_YUYV422, AV_PIX_FMT_RGB24,
+    AV_PIX_FMT_BGR24,
+    STATUS_STOPPED, STATUS_CONNECTING, STATUS_CONNECTED, STATUS_DISCONNECTED,
+    STATUS_ERROR, STATUS_RECONNECTING, STATUS_BUFFERING, STATUS_MAX_SLOTS,
+)
+
+# Estado da biblioteca carregada. C_LIBRARY e IS_INTERFACE_READY são expostos
+# via __getattr__ do módulo e disparam o carregamento no primeiro acesso.
+_c_library = None
+_interface_ready = False
+_loaded = False
+_load_lock = threading.Lock()
+
+# Nome base sem 'lib' pois o CMakeLists remove o prefixo no Linux
+_LIB_BASE_NAME = "camera_pipeline_c"
+
+# Nomes candidatos por sistema operacional, em ordem de preferência
+_LIB_FILENAMES = {
+    "Windows": (f"{_LIB_BASE_NAME}.dll",),
+    "Darwin": (f"{_LIB_BASE_NAME}.dylib", f"lib{_LIB_BASE_NAME}.dylib"),
+}
+_LIB_FILENAMES_DEFAULT = (f"{_LIB_BASE_NAME}.so",)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_lib_path():
+    """
+    Resolve o caminho da biblioteca C uma única vez por processo.
+
+    Usa o nome registrado pelo CMake em _lib_location.py (instalado ao lado da
+    biblioteca). Sem ele (ex.: árvore de código sem build), procura os nomes
+    candidatos no diretório do pacote e só então recorre a
+    ctypes.util.find_library, pois no Linux ela dispara ldconfig/gcc.
+
+    Retorna:
+        O caminho da biblioteca ou None se não encontrada.
+    """
+    lib_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        from ._lib_location import LIB_FILENAME
+    except ImportError:
+        LIB_FILENAME = None
+    if LIB_FILENAME:
+        candidate = os.path.join(lib_dir, LIB_FILENAME)
+        if os.path.exists(candidate):
+            return candidate
+
+    # Uma leitura do diretório em vez de um stat por nome candidato
+    try:
+        with os.scandir(lib_dir) as entries:
+            present = {entry.name for entry in entries}
+    except OSError:
+        present = set()
+    for lib_filename in _LIB_FILENAMES.get(platform.system(), _LIB_FILENAMES_DEFAULT):
+        if lib_filename in present:
+            return os.path.join(lib_dir, lib_filename)
+
+    return ctypes.util.find_library(_LIB_BASE_NAME)
+
+
+def _dlopen_kwargs():
+    """
+    Argumentos de ctypes.CDLL para a plataforma atual.
+
+    POSIX: RTLD_NOW resolve todos os símbolos no carregamento (sem custo de
+    binding preguiçoso na primeira chamada de cada função, e falha cedo se
+    faltar algo do FFmpeg); RTLD_NODELETE mantém a biblioteca mapeada mesmo
+    que o handle seja coletado, pois há threads C rodando código dela.
+    Windows: winmode=0 usa a busca padrão do LoadLibrary (inclui PATH, onde
+    normalmente estão as DLLs do FFmpeg).
+    """
+    if platform.system() == "Windows":
+        return {"winmode": 0}
+    return {"mode": os.RTLD_NOW | os.RTLD_LOCAL | getattr(os, "RTLD_NODELETE", 0)}
+
 
 def _load_c_library():
     """Carrega a biblioteca C principal a partir do diretório do pacote."""
-    global C_LIBRARY, IS_INTERFACE_READY
+    global _c_library, _interface_ready
 
-    if C_LIBRARY is not None:
+    # _c_library é o único cache do handle: a biblioteca é aberta uma vez por processo
+    if _c_library is not None:
         return True # Já carregada
 
-    lib_filename = ""
-    system = platform.system()
-    # Usar o nome base sem 'lib' pois o CMakeLists remove o prefixo no Linux
-    lib_base_name = 'camera_pipeline_c' 
-
-    if system == "Windows":
-        lib_filename = f"{lib_base_name}.dll"
-    elif system == "Darwin": # macOS
-        lib_filename = f"{lib_base_name}.dylib"
-    else: # Linux e outros
-        lib_filename = f"{lib_base_name}.so"
-
-    # Caminho esperado da biblioteca dentro do pacote instalado
-    # __file__ é o caminho para c_interface.py
-    # os.path.dirname(__file__) é o diretório camera_pipeline/core/
-    expected_path = os.path.join(os.path.dirname(__file__), lib_filename)
+    expected_path = _resolve_lib_path()
+    if expected_path is None:
+        logger.error("Biblioteca C '%s' não encontrada em %s", _LIB_BASE_NAME, os.path.dirname(__file__))
+        return False
 
-    logger.debug(f"Tentando carregar a biblioteca C de: {expected_path}")
+    logger.debug("Tentando carregar a biblioteca C de: %s", expected_path)
 
     try:
-        if os.path.exists(expected_path):
-            # Carregar a biblioteca. O dynamic linker do SO cuidará das dependências (FFmpeg).
-            # Remover RTLD_GLOBAL para teste
-            C_LIBRARY = ctypes.CDLL(expected_path)
-            logger.info(f"Biblioteca C carregada com sucesso de: {expected_path}")
-            IS_INTERFACE_READY = True
-            return True
-        else:
-            logger.error(f"Arquivo da biblioteca C não encontrado em: {expected_path}")
-            return False
+        # Carregar a biblioteca. O dynamic linker do SO cuidará das dependências (FFmpeg).
+        _c_library = ctypes.CDLL(expected_path, **_dlopen_kwargs())
+        logger.info("Biblioteca C carregada com sucesso de: %s", expected_path)
+        _interface_ready = True
+        return True
     except OSError as e:
-        logger.error(f"Falha ao carregar biblioteca C de {expected_path}: {e}", exc_info=True)
+        logger.error("Falha ao carregar biblioteca C de %s: %s", expected_path, e, exc_info=True)
         # Tentar obter informações sobre dependências ausentes (útil para debug)
-        if system == "Linux":
+        if platform.system() == "Linux":
             try:
                 logger.error("Verificando dependências ausentes com ldd...")
                 result = os.popen(f"ldd {expected_path}").read()
-                logger.error(f"Resultado do ldd para {expected_path}:\n{result}")
+                logger.error("Resultado do ldd para %s:\n%s", expected_path, result)
             except Exception as ldd_e:
-                 logger.error(f"Falha ao executar ldd: {ldd_e}")
+                 logger.error("Falha ao executar ldd: %s", ldd_e)
         return False
 
-# --- Tentar carregar a biblioteca na inicialização do módulo ---
-if not _load_c_library():
-    logger.critical("Interface C não pôde ser inicializada. Funcionalidades dependentes não estarão disponíveis.")
-    # Você pode querer levantar uma exceção aqui se a biblioteca for absolutamente essencial
-    # raise ImportError("Falha crítica ao inicializar a interface C.")
-
 # --- Definição das Estruturas C --- 
 
 class CallbackFrameData(ctypes.Structure):
@@ -110,6 +139,42 @@ class CallbackFrameData(ctypes.Structure):
         ("data_buffer_size", ctypes.c_size_t * 4)
     ]
 
+def _build_frame_header_struct():
+    """
+    Monta um struct.Struct com o layout de CallbackFrameData, lendo só o plano 0:
+    (width, height, format, pts, camera_id, ref_count, data[0], linesize[0], data_buffer_size[0]).
+
+    Os deslocamentos vêm dos descritores ctypes (CallbackFrameData.<campo>.offset), então
+    o formato acompanha o tamanho de ponteiro/size_t da plataforma (32 ou 64 bits).
+    """
+    fields = (
+        ("width", "i"), ("height", "i"), ("format", "i"), ("pts", "q"),
+        ("camera_id", "i"), ("ref_count", "i"), ("data", "P"),
+        ("linesize", "i"), ("data_buffer_size", "N"),
+    )
+    parts = []
+    pos = 0
+    for name, code in fields:
+        offset = getattr(CallbackFrameData, name).offset
+        if offset > pos:
+            parts.append(f"{offset - pos}x")
+        parts.append(code)
+        pos = offset + struct.calcsize("@" + code)
+    tail = ctypes.sizeof(CallbackFrameData) - pos
+    if tail > 0:
+        parts.append(f"{tail}x")
+    header = struct.Struct("@" + "".join(parts))
+    if header.size != ctypes.sizeof(CallbackFrameData):
+        raise RuntimeError(
+            f"Layout de CallbackFrameData inesperado ({header.size} != {ctypes.sizeof(CallbackFrameData)})"
+        )
+    return header
+
+
+# Usado para desempacotar em lote os cabeçalhos copiados por processor_drain_frames,
+# em vez de materializar um CallbackFrameData (.contents) e ler campo a campo por frame.
+CALLBACK_FRAME_HEADER = _build_frame_header_struct()
+
 # --- Definição dos Tipos de Callback --- 
 
 # void (*status_callback_t)(int camera_id, int status_code, const char* message, void* user_data);
@@ -117,67 +182,136 @@ STATUS_CALLBACK_FUNC_TYPE = ctypes.CFUNCTYPE(
     None,                   # Tipo de retorno (void)
     ctypes.c_int,           # camera_id
     ctypes.c_int,           # status_code
-    ctypes.c_char_p,        # message
-    ctypes.py_object        # user_data (passamos a instância do Processor)
+    ctypes.c_void_p,        # message (decodificada só quando necessário, ver processor)
+    ctypes.c_void_p         # user_data (não usado: o despacho é pelo camera_id)
 )
 
 # void (*frame_callback_t)(CallbackFrameData* frame_data, void* user_data);
 FRAME_CALLBACK_FUNC_TYPE = ctypes.CFUNCTYPE(
     None,                                 # Tipo de retorno (void)
     ctypes.POINTER(CallbackFrameData),    # frame_data
-    ctypes.py_object                      # user_data
+    ctypes.c_void_p                       # user_data
 )
 
 # --- Configuração das Funções da Biblioteca --- 
 
+# Funções C expostas como globais deste módulo após o carregamento
+_C_FUNCTION_NAMES = (
+    "logger_set_level",
+    "processor_initialize",
+    "processor_add_camera",
+    "processor_stop_camera",
+    "processor_shutdown",
+    "processor_drain_frames",
+    "callback_pool_return_data",
+    "callback_pool_return_batch",
+    "callback_pool_free_buffer",
+)
+
+
 def _define_c_functions():
     """Define argtypes e restype para as funções C."""
-    if not C_LIBRARY:
+    global _interface_ready
+    lib = _c_library
+    if not lib:
         return
 
     try:
         # void logger_set_level(int level);
-        C_LIBRARY.logger_set_level.argtypes = [ctypes.c_int]
-        C_LIBRARY.logger_set_level.restype = None
+        lib.logger_set_level.argtypes = [ctypes.c_int]
+        lib.logger_set_level.restype = None
         
         # int processor_initialize();
-        C_LIBRARY.processor_initialize.argtypes = []
-        C_LIBRARY.processor_initialize.restype = ctypes.c_int
+        lib.processor_initialize.argtypes = []
+        lib.processor_initialize.restype = ctypes.c_int
         
-        # int processor_add_camera(int camera_id, const char* url, status_callback_t status_cb, frame_callback_t frame_cb, void* status_user_data, void* frame_user_data, int target_fps);
-        C_LIBRARY.processor_add_camera.argtypes = [
+        # int processor_add_camera(int camera_id, const char* url, status_callback_t status_cb, frame_callback_t frame_cb, void* status_user_data, void* frame_user_data, int target_fps, int pixel_format);
+        lib.processor_add_camera.argtypes = [
             ctypes.c_int,               # camera_id (NOVO PRIMEIRO ARGUMENTO)
             ctypes.c_char_p,            # url
             STATUS_CALLBACK_FUNC_TYPE,  # status_cb
             FRAME_CALLBACK_FUNC_TYPE,   # frame_cb
-            ctypes.py_object,           # status_user_data
-            ctypes.py_object,           # frame_user_data
-            ctypes.c_int                # target_fps
+            ctypes.c_void_p,            # status_user_data
+            ctypes.c_void_p,            # frame_user_data
+            ctypes.c_int,               # target_fps
+            ctypes.c_int                # pixel_format (AV_PIX_FMT_BGR24 ou AV_PIX_FMT_YUV420P)
         ]
-        C_LIBRARY.processor_add_camera.restype = ctypes.c_int # Deve retornar 0 em sucesso, < 0 em erro
+        lib.processor_add_camera.restype = ctypes.c_int # Deve retornar 0 em sucesso, < 0 em erro
         
         # int processor_stop_camera(int camera_id);
-        C_LIBRARY.processor_stop_camera.argtypes = [ctypes.c_int]
-        C_LIBRARY.processor_stop_camera.restype = ctypes.c_int
+        lib.processor_stop_camera.argtypes = [ctypes.c_int]
+        lib.processor_stop_camera.restype = ctypes.c_int
         
         # int processor_shutdown();
-        C_LIBRARY.processor_shutdown.argtypes = []
-        C_LIBRARY.processor_shutdown.restype = ctypes.c_int
+        lib.processor_shutdown.argtypes = []
+        lib.processor_shutdown.restype = ctypes.c_int
         
-        # void callback_pool_return_data(CallbackFrameData* data);
-        C_LIBRARY.callback_pool_return_data.argtypes = [ctypes.POINTER(CallbackFrameData)]
-        C_LIBRARY.callback_pool_return_data.restype = None
+        # int processor_drain_frames(CallbackFrameData** out_frames, CallbackFrameData* out_headers, int max_frames, int timeout_ms);
+        # Os ponteiros são recebidos como endereços (c_void_p) para não compartilharem o array de saída
+        lib.processor_drain_frames.argtypes = [
+            ctypes.POINTER(ctypes.c_void_p),  # out_frames
+            ctypes.POINTER(CallbackFrameData),  # out_headers (cópias contíguas)
+            ctypes.c_int,                     # max_frames
+            ctypes.c_int                      # timeout_ms
+        ]
+        lib.processor_drain_frames.restype = ctypes.c_int
+
+        # int callback_pool_return_data(CallbackFrameData* data);
+        # Aceita o endereço (int) do item, como recebido de processor_drain_frames.
+        # Retorna 0 (devolvido), -1 (pool destruído: o buffer é do chamador) ou -2 (inválido)
+        lib.callback_pool_return_data.argtypes = [ctypes.c_void_p]
+        lib.callback_pool_return_data.restype = ctypes.c_int
+
+        # int callback_pool_return_batch(CallbackFrameData** items, int count);
+        # Retorna o número de itens devolvidos, ou -1 se o pool já foi destruído
+        lib.callback_pool_return_batch.argtypes = [
+            ctypes.POINTER(ctypes.c_void_p),  # items
+            ctypes.c_int                      # count
+        ]
+        lib.callback_pool_return_batch.restype = ctypes.c_int
+
+        # void callback_pool_free_buffer(void* buffer);
+        lib.callback_pool_free_buffer.argtypes = [ctypes.c_void_p]
+        lib.callback_pool_free_buffer.restype = None
         
+        # Publicar as funções como globais do módulo: quem chama com frequência
+        # (ex.: devolução de frames ao pool) evita o getattr no CDLL a cada chamada
+        globals().update({name: getattr(lib, name) for name in _C_FUNCTION_NAMES})
+
         logger.info("Protótipos das funções C definidos com sucesso.")
 
     except AttributeError as e:
-        global IS_INTERFACE_READY
-        logger.error(f"Erro ao definir protótipo de função C: {e}. A biblioteca pode estar incompleta ou corrompida.")
-        IS_INTERFACE_READY = False
-
-# --- Inicialização --- 
-# Tenta carregar a biblioteca e definir as funções ao importar o módulo
-if _load_c_library():
-    _define_c_functions()
-else:
-    logger.warning("Interface C não pôde ser inicializada. Funcionalidades dependentes não estarão disponíveis.")
+        logger.error("Erro ao definir protótipo de função C: %s. A biblioteca pode estar incompleta ou corrompida.", e)
+        _interface_ready = False
+
+# --- Inicialização ---
+# A biblioteca só é carregada no primeiro acesso a C_LIBRARY/IS_INTERFACE_READY,
+# para que importar o pacote não custe dlopen (nem falhe) quando ela não é usada.
+
+def _ensure_loaded():
+    """Carrega a biblioteca e define os protótipos uma única vez (thread-safe)."""
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        if _load_c_library():
+            _define_c_functions()
+        else:
+            logger.warning("Interface C não pôde ser inicializada. Funcionalidades dependentes não estarão disponíveis.")
+        _loaded = True
+
+
+def __getattr__(name):
+    if name == "C_LIBRARY":
+        _ensure_loaded()
+        return _c_library
+    if name == "IS_INTERFACE_READY":
+        _ensure_loaded()
+        return _interface_ready
+    if name in _C_FUNCTION_NAMES:
+        _ensure_loaded()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
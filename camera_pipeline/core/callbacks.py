@@ -8,7 +8,18 @@ FrameType = np.ndarray
 class FrameCallback(abc.ABC):
     """
     Interface para callbacks de processamento de frames.
+
+    Por padrão o frame é uma view sem cópia do buffer C, que só volta ao pool
+    quando o array for liberado. Callbacks lentos ou que guardam frames podem
+    definir wants_zero_copy = False para receber uma cópia e liberar o buffer C
+    antes de process_frame. Com CameraProcessor(copy_buffer_count=N), essas cópias
+    vêm de um anel por câmera e devem ser devolvidas com release_copy_buffer.
+
+    O instante de chegada de cada frame fica em frame_info["timestamp"]
+    (CameraProcessor.get_latest_frames): relógio de parede, time.time().
     """
+
+    wants_zero_copy = True
     
     @abc.abstractmethod
     def process_frame(self, camera_id: int, frame: FrameType) -> None:
@@ -17,14 +28,45 @@ class FrameCallback(abc.ABC):
         
         Args:
             camera_id: ID da câmera que gerou o frame.
-            frame: Dados do frame (np.ndarray).
+            frame: Dados do frame. Sempre um np.ndarray uint8 (view sem cópia do
+                buffer C), nunca bytes/bytearray.
+        """
+        pass
+
+class RawBufferFrameCallback(abc.ABC):
+    """
+    Interface para callbacks que recebem o buffer do frame sem passar pelo NumPy.
+
+    process_frame recebe um memoryview (formato 'B', sem cópia) do plano
+    empacotado entregue pelo C: BGR24 em linhas de width * 3 bytes, ou I420
+    (Y, U, V) para câmeras registradas com AV_PIX_FMT_YUV420P. Útil para
+    repassar bytes a sockets, arquivos ou encoders que aceitam o buffer protocol.
+    O item do pool C só é devolvido quando o memoryview for liberado.
+    """
+
+    wants_zero_copy = True
+
+    @abc.abstractmethod
+    def process_frame(self, camera_id: int, frame: memoryview) -> None:
+        """
+        Processa o buffer de um frame recebido de uma câmera.
+
+        Args:
+            camera_id: ID da câmera que gerou o frame.
+            frame: Buffer do frame (memoryview, ou bytes se wants_zero_copy = False).
         """
         pass
 
 class StatusCallback(abc.ABC):
     """
     Interface para callbacks de atualização de status.
+
+    Para os códigos conhecidos a mensagem é uma string fixa pré-calculada.
+    Subclasses que precisem sempre do texto enviado pelo C definem
+    wants_raw_message = True.
     """
+
+    wants_raw_message = False
     
     @abc.abstractmethod
     def update_status(self, camera_id: int, status_code: int, message: str) -> None:
@@ -50,6 +92,32 @@ class SimpleFrameCallback(FrameCallback):
     def process_frame(self, camera_id: int, frame: FrameType) -> None:
         self._callback(camera_id, frame)
 
+class BGRFrameCallback(FrameCallback):
+    """
+    Base para callbacks que precisam de BGR em câmeras registradas com
+    pixel_format=AV_PIX_FMT_YUV420P. Converte o array I420 (h * 3 // 2, w)
+    com OpenCV e entrega o resultado (h, w, 3) em process_bgr_frame.
+    Frames que já chegam em BGR (h, w, 3) são repassados sem conversão.
+    """
+
+    def process_frame(self, camera_id: int, frame: FrameType) -> None:
+        if frame.ndim == 2:
+            import cv2  # Dependência opcional, só necessária para a conversão
+
+            frame = cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)
+        self.process_bgr_frame(camera_id, frame)
+
+    @abc.abstractmethod
+    def process_bgr_frame(self, camera_id: int, frame: FrameType) -> None:
+        """
+        Processa um frame já convertido para BGR.
+
+        Args:
+            camera_id: ID da câmera que gerou o frame.
+            frame: Array BGR (height, width, 3).
+        """
+        pass
+
 class SimpleStatusCallback(StatusCallback):
     """
     Implementação simples de StatusCallback que delega para uma função.
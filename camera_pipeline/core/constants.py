@@ -0,0 +1,35 @@
+# Constantes espelhadas das definições C.
+# Ficam separadas de c_interface para que importá-las não carregue a biblioteca C.
+
+# Número máximo de câmeras (espelho de MAX_CAMERAS em camera_processor.h).
+# IDs de câmera válidos ficam em [0, MAX_CAMERAS).
+MAX_CAMERAS = 2048
+
+# Constantes de nível de log (espelho das definições C)
+LOG_LEVEL_QUIET = -8
+LOG_LEVEL_PANIC = 0
+LOG_LEVEL_FATAL = 8
+LOG_LEVEL_ERROR = 16
+LOG_LEVEL_WARNING = 24
+LOG_LEVEL_INFO = 32
+LOG_LEVEL_VERBOSE = 40
+LOG_LEVEL_DEBUG = 48
+LOG_LEVEL_TRACE = 56
+
+# Constantes de formato de pixel (espelho das definições C)
+AV_PIX_FMT_NONE = -1
+AV_PIX_FMT_YUV420P = 0
+AV_PIX_FMT_YUYV422 = 1
+AV_PIX_FMT_RGB24 = 2
+AV_PIX_FMT_BGR24 = 3
+# Adicione outros formatos conforme necessário
+
+# Constantes de status da câmera (espelho das definições C)
+STATUS_STOPPED = 0
+STATUS_CONNECTING = 1
+STATUS_CONNECTED = 2
+STATUS_DISCONNECTED = 3
+STATUS_ERROR = 4
+STATUS_RECONNECTING = 5
+STATUS_BUFFERING = 6
+STATUS_MAX_SLOTS = 7
@@ -1,7 +1,153 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import mmap
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
-from typing import Optional
+import queue
+import struct
+from typing import List, Optional
+
+# Listener que grava os registros em disco/console a partir de uma thread própria.
+_listener: Optional[QueueListener] = None
+
+
+# Cabeçalho do arquivo em anel: assinatura, tamanho da área de dados, posição
+# de escrita (head) e bytes já ocupados da área (used, no máximo a capacidade),
+# persistidos a cada registro para o anel poder ser lido depois.
+_RING_MAGIC = b"CPLRING2"
+_RING_HEADER = struct.Struct("<8sQQQ")
+# Cada registro começa com este byte; após a volta do anel, o leitor descarta
+# o trecho antes do primeiro separador (resto de um registro sobrescrito).
+_RING_SEPARATOR = b"\x1e"
+_RING_MIN_BYTES = 4096
+
+
+def _check_ring_size(size):
+    if size < _RING_MIN_BYTES:
+        raise ValueError(
+            f"Tamanho do log em anel deve ser de pelo menos {_RING_MIN_BYTES} bytes (recebido {size})."
+        )
+
+
+class _MmapRingHandler(logging.Handler):
+    """
+    Handler que grava os registros num arquivo de tamanho fixo mapeado em memória,
+    sobrescrevendo os mais antigos em anel: sem rotação, sem rename, sem stat.
+    Só é chamado pela thread do QueueListener (sob o lock do handler).
+
+    Só abre arquivos vazios ou anéis criados por ele (assinatura no cabeçalho),
+    para nunca truncar um log comum; um anel existente continua de onde parou.
+    Use read_mmap_log para ler os registros em ordem.
+    """
+
+    def __init__(self, path: str, size: int):
+        super().__init__()
+        _check_ring_size(size)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            state = self._read_existing_state(path, size)
+            if state is None:
+                os.ftruncate(self._fd, size)
+                state = (0, 0)
+            # ACCESS_WRITE em vez de prot/flags: funciona também no Windows
+            self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_WRITE)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._capacity = size - _RING_HEADER.size
+        self._head, self._used = state
+        self._write_header()
+
+    def _write_header(self):
+        _RING_HEADER.pack_into(self._map, 0, _RING_MAGIC, self._capacity, self._head, self._used)
+
+    def _read_existing_state(self, path, size):
+        """
+        (head, used) de um anel existente do mesmo tamanho, ou None se o arquivo
+        está vazio ou o anel precisa ser recriado (outro tamanho ou cabeçalho
+        inconsistente).
+        """
+        current = os.fstat(self._fd).st_size
+        if current == 0:
+            return None
+        header = os.read(self._fd, _RING_HEADER.size)
+        if not header.startswith(_RING_MAGIC[:-1]):
+            raise ValueError(
+                f"{path} não é um log em anel do camera_pipeline; recusando sobrescrevê-lo."
+            )
+        # Anel de uma versão anterior do cabeçalho: recriado
+        if len(header) < _RING_HEADER.size or header[:len(_RING_MAGIC)] != _RING_MAGIC:
+            return None
+        _, capacity, head, used = _RING_HEADER.unpack(header)
+        if current != size or capacity != size - _RING_HEADER.size or head >= capacity:
+            return None
+        # Antes da primeira volta, a parte ocupada termina exatamente em head
+        if used > capacity or (used < capacity and used != head):
+            return None
+        return head, used
+
+    def emit(self, record):
+        try:
+            text = self.format(record).replace("\x1e", " ") + "\n"
+            data = _RING_SEPARATOR + text.encode("utf-8", "replace")[-(self._capacity - 1):]
+            base = _RING_HEADER.size
+            offset = self._head
+            first = min(len(data), self._capacity - offset)
+            self._map[base + offset:base + offset + first] = data[:first]
+            if first < len(data):
+                self._map[base:base + len(data) - first] = data[first:]
+            self._head = (offset + len(data)) % self._capacity
+            self._used = min(self._used + len(data), self._capacity)
+            self._write_header()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            if self._map is not None:
+                self._map.close()
+                os.close(self._fd)
+                self._map = None
+        finally:
+            self.release()
+        super().close()
+
+
+def read_mmap_log(path: str) -> List[str]:
+    """
+    Lê um log em anel gravado com use_mmap_log=True.
+
+    Retorna:
+        Os registros completos ainda no arquivo, do mais antigo ao mais novo.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if len(raw) < _RING_HEADER.size or raw[:len(_RING_MAGIC)] != _RING_MAGIC:
+        raise ValueError(f"{path} não é um log em anel do camera_pipeline.")
+    _, capacity, head, used = _RING_HEADER.unpack_from(raw)
+    area = raw[_RING_HEADER.size:_RING_HEADER.size + capacity]
+    if used < capacity:
+        # Ainda sem volta: só o trecho escrito, do início até head
+        ordered = area[:used]
+    else:
+        # Do mais antigo (logo após head) ao mais novo
+        ordered = area[head:] + area[:head]
+    # O primeiro pedaço é vazio ou o resto de um registro já sobrescrito
+    records = ordered.split(_RING_SEPARATOR)[1:]
+    return [record.decode("utf-8", "replace").rstrip("\n") for record in records]
+
+
+def _stop_listener():
+    """Para o listener ativo, esvaziando a fila antes de fechar os handlers."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
 
 def setup_logging(
     log_dir: str = "logs",
@@ -11,22 +157,35 @@ def setup_logging(
     camera_id: Optional[int] = None,
     max_bytes: int = 100 * 1024 * 1024,  # 100MB
     backup_count: int = 5,
+    use_mmap_log: bool = False,
 ):
     """
     Configura o sistema de logging global do Python.
     Se per_camera=True e camera_id for fornecido, cria um arquivo de log separado por câmera.
     Caso contrário, usa um arquivo geral.
+    Os handlers de arquivo e console rodam numa thread do QueueListener; o logger
+    raiz apenas enfileira, para que callbacks das threads C não bloqueiem em I/O.
+    Com use_mmap_log=True os registros vão para um anel fixo de max_bytes (sem
+    rotação) em camera_pipeline*.ring, lido com read_mmap_log.
     """
+    global _listener
+
+    if use_mmap_log:
+        # Antes de desmontar a configuração atual: um tamanho inválido não a derruba
+        _check_ring_size(max_bytes)
     os.makedirs(log_dir, exist_ok=True)
+    # O anel tem extensão própria: nunca reaproveita (nem trunca) um .log comum
+    extension = ".ring" if use_mmap_log else ".log"
     if per_camera and camera_id is not None:
-        log_file = os.path.join(log_dir, f"camera_pipeline_{camera_id}.log")
+        log_file = os.path.join(log_dir, f"camera_pipeline_{camera_id}{extension}")
     else:
-        log_file = os.path.join(log_dir, "camera_pipeline.log")
+        log_file = os.path.join(log_dir, f"camera_pipeline{extension}")
 
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
     # Remover handlers antigos para evitar duplicidade
+    _stop_listener()
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
 
@@ -35,15 +194,26 @@ def setup_logging(
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    file_handler = RotatingFileHandler(
-        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
-    )
+    if use_mmap_log:
+        file_handler = _MmapRingHandler(log_file, max_bytes)
+    else:
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    handlers = [file_handler]
 
     if log_to_console:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    logging.info(f"Logging configurado. Arquivo: {log_file} | Nível: {logging.getLevelName(log_level)}") 
+
 
-    logging.info(f"Logging configurado. Arquivo: {log_file} | Nível: {logging.getLevelName(log_level)}") 
\ No newline at end of file
+atexit.register(_stop_listener)
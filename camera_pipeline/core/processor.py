@@ -1,32 +1,49 @@
+import collections
 import ctypes
 import queue
+import sys
 import time
 import threading
 import logging
-import numpy as np
-from typing import Callable, Dict, Any, Optional, Union
-
-# Importar definições da interface C
+import warnings
+from typing import Callable, Dict, Any, List, Optional, Union
+
+# NumPy é obrigatório: os frames são sempre entregues como ndarray/memoryview e não
+# existe caminho de cópia byte a byte em Python (lento demais para streams ao vivo).
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "camera_pipeline requer NumPy (pip install 'numpy>=1.20')."
+    ) from e
+
+# Importar definições da interface C (a biblioteca é carregada sob demanda)
+from . import c_interface
 from .c_interface import (
-    C_LIBRARY,
-    IS_INTERFACE_READY,
     STATUS_CALLBACK_FUNC_TYPE,
     FRAME_CALLBACK_FUNC_TYPE,
     CallbackFrameData,
+    CALLBACK_FRAME_HEADER,
+)
+from .constants import (
     AV_PIX_FMT_BGR24,
+    AV_PIX_FMT_YUV420P,
     LOG_LEVEL_DEBUG,
     LOG_LEVEL_INFO,
     LOG_LEVEL_WARNING,
     LOG_LEVEL_ERROR,
+    MAX_CAMERAS,
     STATUS_STOPPED,
     STATUS_CONNECTING,
     STATUS_CONNECTED,
     STATUS_DISCONNECTED,  # E outros estados se necessário
+    STATUS_RECONNECTING,
 )
 
 # Importar interfaces de callback
 from .callbacks import (
     FrameCallback,
+    RawBufferFrameCallback,
     StatusCallback,
     SimpleFrameCallback,
     SimpleStatusCallback,
@@ -49,44 +66,568 @@ FrameCallbackType = Callable[[int, np.ndarray], None]
 # Callback de status: recebe (camera_id: int, status_code: int, message: str)
 StatusCallbackType = Callable[[int, int, str], None]
 
+# Mensagens fixas enviadas pelo C (update_camera_status em camera_thread.c) por código.
+# Para esses códigos a mensagem não precisa ser lida/decodificada da memória C.
+# STATUS_ERROR (4) não entra: o C envia uma mensagem formatada com o tempo de espera.
+_KNOWN_STATUS_MESSAGES = {
+    STATUS_STOPPED: sys.intern("Thread encerrada"),
+    STATUS_CONNECTING: sys.intern("Conectando..."),
+    STATUS_CONNECTED: sys.intern("Conectado"),
+    STATUS_DISCONNECTED: sys.intern("Conexão perdida/finalizada"),
+    STATUS_RECONNECTING: sys.intern("Reconectando..."),
+}
+
+# Máximo de atualizações de status pendentes (as mais antigas são descartadas)
+STATUS_QUEUE_MAXSIZE = 100
+
+_UINT8 = np.dtype(np.uint8)
+
+# Frames retirados por chamada a processor_drain_frames e espera máxima (ms)
+FRAME_DRAIN_BATCH = 64
+FRAME_DRAIN_TIMEOUT_MS = 100
+
+
+# CameraProcessor dono de cada slot de câmera. O C já informa o camera_id em todo
+# callback e em todo frame, então user_data fica NULL e nenhum PyObject cruza a
+# fronteira FFI. Com várias instâncias, cada uma só recebe o que é dos seus slots.
+_STATUS_TARGETS = [None] * MAX_CAMERAS
+_FRAME_TARGETS = [None] * MAX_CAMERAS
+
+
+def _global_status_dispatch(camera_id, status_code, message_ptr, user_data):
+    """Trampolim único de status: despacha para o CameraProcessor dono do slot camera_id."""
+    target = _STATUS_TARGETS[camera_id] if 0 <= camera_id < MAX_CAMERAS else None
+    if target is not None:
+        target._c_status_callback(camera_id, status_code, message_ptr, user_data)
+
+
+# Trampolins compartilhados por todas as câmeras e instâncias. Como globais do
+# módulo nunca são coletados, o C não pode chamar um ponteiro de função liberado.
+_STATUS_TRAMPOLINE = STATUS_CALLBACK_FUNC_TYPE(_global_status_dispatch)
+# frame_cb NULL: os frames vão para a fila consumida por _SharedRuntime._drain_frames
+_NULL_FRAME_CALLBACK = FRAME_CALLBACK_FUNC_TYPE()
+
+
+class _PoolState:
+    """
+    Devolve itens ao pool de callbacks C enquanto ele existe.
+
+    'alive' vira False antes de processor_shutdown. O C não libera o buffer de
+    itens ainda em uso ao destruir o pool: a partir daí quem segura o item (uma
+    view entregue ao usuário, um lote em andamento) libera o buffer diretamente.
+    """
+
+    __slots__ = ("alive", "_return_data", "_return_batch", "_free_buffer")
+
+    def __init__(self, return_data, return_batch, free_buffer):
+        self.alive = True
+        self._return_data = return_data
+        self._return_batch = return_batch
+        self._free_buffer = free_buffer
+
+    def release(self, frame_addr, data_addr):
+        """Devolve um item ao pool ou, se o pool já foi destruído, libera seu buffer."""
+        # -1: pool destruído com o item em uso; -2: item inválido (não é nosso liberar)
+        if self.alive and self._return_data(frame_addr) != -1:
+            return
+        self._free_buffer(data_addr)
+
+    def release_batch(self, items, returns):
+        """
+        Devolve em uma chamada C os itens de 'returns', lista de (frame_addr, data_addr).
+        'items' é o array ctypes de ponteiros usado na chamada.
+        """
+        n = len(returns)
+        if self.alive:
+            items[:n] = [frame_addr for frame_addr, _ in returns]
+            if self._return_batch(items, n) >= 0:
+                return
+        for _, data_addr in returns:
+            self._free_buffer(data_addr)
+
+
+class _FrameReleaser:
+    """
+    Devolve o item do pool C quando o último ndarray que aponta para ele é coletado.
+    Fica pendurado no buffer ctypes que serve de base para o array NumPy.
+    """
+
+    __slots__ = ("_frame_addr", "_data_addr", "_pool_state")
+
+    def __init__(self, frame_addr, data_addr, pool_state):
+        self._frame_addr = frame_addr
+        self._data_addr = data_addr
+        self._pool_state = pool_state
+
+    def __del__(self):
+        addr = self._frame_addr
+        self._frame_addr = None
+        if addr:
+            self._pool_state.release(addr, self._data_addr)
+
+
+class _FrameWorker:
+    """
+    Thread dedicada que entrega os frames de uma câmera ao seu FrameCallback.
+
+    Guarda só o frame mais recente: se o callback não acompanhar, o pendente é
+    substituído (e seu item volta ao pool C) em vez de acumular e segurar o pool.
+    """
+
+    def __init__(self, camera_id, callback):
+        self.camera_id = camera_id
+        self.callback = callback
+        self._cond = threading.Condition(threading.Lock())
+        self._pending = None
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"CameraFrameWorker-{camera_id}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, frame):
+        """Publica o frame para a thread; retorna True se um pendente foi descartado."""
+        with self._cond:
+            dropped = self._pending
+            self._pending = frame
+            self._cond.notify()
+        # 'dropped' é liberado aqui, fora do lock
+        return dropped is not None
+
+    def stop(self, join=True, timeout=3.0):
+        """Encerra a thread, descartando o frame pendente."""
+        with self._cond:
+            self._running = False
+            pending = self._pending
+            self._pending = None
+            self._cond.notify()
+        del pending
+        if join and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning(
+                    f"Thread de frames da câmera ID {self.camera_id} não terminou no timeout."
+                )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                frame = self._pending
+                self._pending = None
+            try:
+                self.callback.process_frame(self.camera_id, frame)
+            except Exception as callback_error:
+                logger.error(
+                    "Erro ao executar callback de frame para câmera ID %s: %s",
+                    self.camera_id, callback_error,
+                )
+            # Soltar a view antes de dormir, para o item voltar ao pool C
+            frame = None
+
+
+class _StatusQueueView:
+    """
+    Fachada com a parte de leitura de queue.Queue sobre o anel de status, para
+    código que ainda usa CameraProcessor.status_queue. Lê com get_status, então
+    compartilha as atualizações com get_status/get_status_batch.
+    """
+
+    def __init__(self, processor):
+        self._processor = processor
+
+    def get(self, block=True, timeout=None):
+        status = self._processor.get_status(timeout=timeout if block else 0)
+        if status is None:
+            raise queue.Empty
+        return status
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self):
+        return len(self._processor._status_ring)
+
+    def empty(self):
+        return not self._processor._status_ring
+
+    def task_done(self):
+        pass
+
+
+class _CopyBufferRing:
+    """
+    Arrays de cópia reaproveitados de uma câmera (callbacks com wants_zero_copy=False
+    e copy_buffer_count > 0), todos com o mesmo shape.
+
+    Um array entregue só volta a ser escrito depois que o usuário o devolve com
+    CameraProcessor.release_copy_buffer; nada é reaproveitado por contagem de
+    referências. Com todos os arrays com o usuário, acquire retorna None e o frame
+    ganha um array novo, fora do anel. Devoluções podem vir de qualquer thread.
+    """
+
+    def __init__(self, shape, size):
+        self.shape = shape
+        self._size = size
+        self._lock = threading.Lock()
+        self._free = []
+        # id -> array de todos os arrays do anel ainda entregues ao usuário
+        self._in_use = {}
+
+    def acquire(self, busy=None):
+        """
+        Array livre do anel (alocado sob demanda até o tamanho do anel), ou None.
+        'busy' (o array publicado em get_latest_frames) nunca é reescrito.
+        """
+        with self._lock:
+            for index in range(len(self._free) - 1, -1, -1):
+                if self._free[index] is not busy:
+                    frame = self._free.pop(index)
+                    break
+            else:
+                if len(self._in_use) + len(self._free) >= self._size:
+                    return None
+                frame = _aligned_empty(self.shape)
+            self._in_use[id(frame)] = frame
+            return frame
+
+    def release(self, frame):
+        """Devolve um array entregue por acquire; False se não é do anel ou já voltou."""
+        with self._lock:
+            if self._in_use.get(id(frame)) is not frame:
+                return False
+            del self._in_use[id(frame)]
+            self._free.append(frame)
+            return True
+
+
+def _validate_frame(width, height, pixel_format, linesize, data_ptr, data_buffer_size):
+    """
+    Valida o cabeçalho de um frame e calcula o tamanho do buffer a expor ao Python.
+
+    Returns:
+        (buffer_size, None) se o frame é válido, ou (0, motivo) caso contrário.
+    """
+    if width <= 0 or height <= 0 or linesize <= 0 or not data_ptr:
+        return 0, f"dados/dims/linesize inválidos: {width}x{height}, L:{linesize}, Ptr:{data_ptr}"
+    if pixel_format == AV_PIX_FMT_BGR24:
+        # O pool C sempre empacota as linhas BGR (callback_pool_get_data grava
+        # linesize = width * 3); qualquer outro valor é um cabeçalho corrompido
+        if linesize == width * 3:
+            return height * linesize, None
+        return 0, f"linesize {linesize} diferente de {width * 3} (linhas BGR empacotadas)"
+    if pixel_format == AV_PIX_FMT_YUV420P:
+        # Layout I420 em um único array exige dimensões pares
+        if not (width | height) & 1 and data_buffer_size == width * height * 3 // 2:
+            return data_buffer_size, None
+        return 0, f"buffer YUV420P inválido para {width}x{height}: {data_buffer_size} bytes"
+    return 0, (
+        f"formato inesperado {pixel_format}, esperado {AV_PIX_FMT_BGR24} ou {AV_PIX_FMT_YUV420P}"
+    )
+
+
+def _dict_without(mapping, key):
+    """Cópia de mapping sem key (atualização copy-on-write dos callbacks)."""
+    return {k: v for k, v in mapping.items() if k != key}
+
+
+def _wrap_buffer(frame_addr, data_addr, buffer_size, pool_state):
+    """
+    Cria um memoryview (formato 'B') sobre o buffer do item do pool, sem cópia.
+    O item só volta ao pool quando o memoryview (e tudo derivado dele, como
+    arrays NumPy) for liberado.
+    """
+    c_buffer = (ctypes.c_uint8 * buffer_size).from_address(data_addr)
+    # O buffer ctypes é a base do memoryview; o releaser vive enquanto ele viver
+    c_buffer._releaser = _FrameReleaser(frame_addr, data_addr, pool_state)
+    return memoryview(c_buffer).cast("B")
+
+
+def _wrap_frame(buffer, width, height, pixel_format):
+    """
+    Cria um np.ndarray sobre o buffer de _wrap_buffer, sem cópia.
+
+    BGR24 vira (height, width, 3), com as linhas empacotadas como vêm do pool C.
+    YUV420P vira o layout I420 (height * 3 // 2, width): plano Y seguido de U e V,
+    pronto para cv2.COLOR_YUV2BGR_I420. Um único construtor np.ndarray, sem as
+    views intermediárias de frombuffer/reshape/slice.
+    """
+    if pixel_format == AV_PIX_FMT_YUV420P:
+        return np.ndarray((height * 3 // 2, width), _UINT8, buffer)
+    return np.ndarray((height, width, 3), _UINT8, buffer)
+
+
+def _aligned_empty(shape, alignment=64):
+    """
+    np.empty de uint8 com início alinhado a 'alignment' bytes. O malloc do NumPy
+    só garante 16; destino alinhado a 64 evita stores divididos no memcpy.
+    """
+    size = 1
+    for dim in shape:
+        size *= dim
+    raw = np.empty(size + alignment - 1, dtype=np.uint8)
+    offset = -raw.ctypes.data % alignment
+    return raw[offset:offset + size].reshape(shape)
+
+
+def _frame_shape(width, height, pixel_format):
+    """Shape do ndarray entregue ao usuário (o mesmo de _wrap_frame)."""
+    if pixel_format == AV_PIX_FMT_YUV420P:
+        return (height * 3 // 2, width)
+    return (height, width, 3)
+
+
+def _copy_frame(data_addr, width, height, pixel_format, buffer_size, as_bytes, out=None):
+    """
+    Copia o frame do buffer C para memória Python com ctypes.memmove (memcpy da libc).
+
+    BGR24 e YUV420P chegam empacotados (validado por _validate_frame), então é
+    sempre uma única cópia do bloco. Retorna bytes se as_bytes, senão um
+    np.ndarray com o mesmo shape de _wrap_frame: 'out' (de um _CopyBufferRing,
+    já com esse shape) quando fornecido, ou um array novo.
+    """
+    if as_bytes:
+        return ctypes.string_at(data_addr, buffer_size)
+    frame = out if out is not None else _aligned_empty(_frame_shape(width, height, pixel_format))
+    ctypes.memmove(frame.ctypes.data, data_addr, buffer_size)
+    return frame
+
+
+class _SharedRuntime:
+    """
+    Processador C, pool e thread de consumo de frames, compartilhados pelo processo.
+
+    A biblioteca C tem um único pool e uma única fila de prontos, então todas as
+    instâncias de CameraProcessor usam a mesma thread de consumo (CameraFrameDrain),
+    que entrega cada frame à instância dona do slot em _FRAME_TARGETS. Os usuários
+    são contados: processor_initialize roda para o primeiro e processor_shutdown só
+    quando o último sai.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._pool_state = None
+        self._drain_thread = None
+        self._drain_stop = None
+
+    def acquire(self, c_lib):
+        """
+        Registra um usuário, inicializando o C e a thread de consumo no primeiro.
+
+        Retorna:
+            0 em sucesso, ou o código de erro de processor_initialize.
+        """
+        with self._lock:
+            if self._users == 0:
+                ret = c_lib.processor_initialize()
+                if ret != 0:
+                    return ret
+                # Pool novo (ou recriado após shutdown)
+                self._pool_state = _PoolState(
+                    c_interface.callback_pool_return_data,
+                    c_interface.callback_pool_return_batch,
+                    c_interface.callback_pool_free_buffer,
+                )
+                self._start_drain_thread()
+            self._users += 1
+            return 0
+
+    def release(self, c_lib, camera_ids):
+        """
+        Remove um usuário. Se outras instâncias seguem usando o C, só as câmeras
+        camera_ids (as do usuário que sai) são paradas; o último usuário para a
+        thread de consumo e chama processor_shutdown.
+
+        Retorna:
+            None se ainda há usuários, ou o código de retorno de processor_shutdown.
+        """
+        with self._lock:
+            self._users -= 1
+            if self._users > 0:
+                for camera_id in camera_ids:
+                    c_lib.processor_stop_camera(camera_id)
+                return None
+            self._stop_drain_thread()
+            # Antes do shutdown C: a partir daqui frames ainda referenciados pelo
+            # usuário não voltam ao pool, e sim liberam o próprio buffer
+            self._pool_state.alive = False
+            return c_lib.processor_shutdown()
+
+    def _start_drain_thread(self):
+        """Inicia a thread que consome a fila de frames prontos do C."""
+        # Event e pool próprios de cada thread: uma thread antiga que ainda não
+        # saiu (callback lento no shutdown) não volta a consumir após um reinício
+        self._drain_stop = threading.Event()
+        self._drain_thread = threading.Thread(
+            target=self._drain_frames,
+            args=(self._drain_stop, self._pool_state),
+            name="CameraFrameDrain",
+            daemon=True,
+        )
+        self._drain_thread.start()
+        logger.info("Thread de consumo de frames iniciada.")
+
+    def _stop_drain_thread(self):
+        """Para a thread de consumo de frames (retorna em até FRAME_DRAIN_TIMEOUT_MS)."""
+        if self._drain_thread is None:
+            return
+
+        self._drain_stop.set()
+        # shutdown() chamado de dentro de um FrameCallback roda na própria thread
+        if self._drain_thread is not threading.current_thread():
+            self._drain_thread.join(timeout=3.0)
+            if self._drain_thread.is_alive():
+                logger.warning("Thread de consumo de frames não terminou no timeout.")
+            else:
+                logger.info("Thread de consumo de frames encerrada.")
+        self._drain_thread = None
+
+    @staticmethod
+    def _drain_frames(stop_event, pool_state):
+        """
+        Laço da thread de consumo: retira frames em lote do C (a chamada libera a GIL
+        enquanto espera) e entrega cada um ao _handle_c_frame do dono da câmera.
+        """
+        out_frames = (ctypes.c_void_p * FRAME_DRAIN_BATCH)()
+        out_headers = (CallbackFrameData * FRAME_DRAIN_BATCH)()
+        # Itens já consumidos (cópia feita ou frame descartado), devolvidos ao
+        # pool numa única chamada C ao fim de cada lote: (frame_addr, data_addr)
+        returns = []
+        return_items = (ctypes.c_void_p * FRAME_DRAIN_BATCH)()
+        header_size = CALLBACK_FRAME_HEADER.size
+        # Locais: LOAD_FAST em vez de busca de atributo/global a cada lote/frame
+        drain_frames = c_interface.processor_drain_frames
+        unpack_headers = CALLBACK_FRAME_HEADER.iter_unpack
+        string_at = ctypes.string_at
+        targets = _FRAME_TARGETS
+
+        while not stop_event.is_set():
+            try:
+                count = drain_frames(
+                    out_frames, out_headers, FRAME_DRAIN_BATCH, FRAME_DRAIN_TIMEOUT_MS
+                )
+            except Exception as e:
+                logger.exception(f"Erro ao consumir frames da biblioteca C: {e}")
+                break
+            if count < 0:
+                logger.info("Fila de frames C encerrada.")
+                break
+            if count == 0:
+                continue
+
+            # Uma cópia e um unpack para o lote inteiro de cabeçalhos
+            headers = unpack_headers(string_at(out_headers, header_size * count))
+            CameraProcessor._debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            try:
+                for frame_addr, header in zip(out_frames[:count], headers):
+                    # Leitura sem lock: cada slot é trocado atomicamente por register/stop
+                    cam_id = header[4]
+                    target = targets[cam_id] if 0 <= cam_id < MAX_CAMERAS else None
+                    if target is None:
+                        logger.warning(
+                            "[Callback Frame ID %s] Frame descartado: câmera inativa/removida.",
+                            cam_id,
+                        )
+                        returns.append((frame_addr, header[6]))
+                        continue
+                    target._handle_c_frame(frame_addr, header, returns, pool_state)
+            finally:
+                if returns:
+                    pool_state.release_batch(return_items, returns)
+                    returns.clear()
+
+
+_RUNTIME = _SharedRuntime()
+
 
 class CameraProcessor:
     """
     Gerencia a interação com a biblioteca C para processar streams de múltiplas câmeras.
+
+    As threads C de decodificação nunca tomam a GIL para entregar frames: elas os
+    enfileiram no C e uma única thread Python (CameraFrameDrain), compartilhada por
+    todas as instâncias do processo, os retira em lotes de até FRAME_DRAIN_BATCH por
+    chamada e os entrega à instância dona de cada câmera. Por padrão todos os
+    FrameCallback rodam nessa thread, em sequência; um callback lento atrasa as demais
+    câmeras (a fila C descarta os frames mais antigos quando enche). Com frame_worker_threads=True cada
+    câmera ganha uma thread própria (CameraFrameWorker-<id>) que recebe só o frame
+    mais recente, e a thread de consumo apenas despacha. Callbacks de status
+    continuam sendo chamados nas threads C de cada câmera.
+
+    Callbacks com wants_zero_copy=False recebem um array próprio por frame. Com
+    copy_buffer_count=N > 0, cada câmera reaproveita até N arrays: o usuário devolve
+    cada frame com release_copy_buffer() quando terminar de usá-lo, e enquanto
+    nenhum foi devolvido os frames seguintes ganham arrays novos.
+
+    Várias instâncias podem coexistir, desde que usem camera_id distintos: o
+    processador C só é desligado no shutdown() da última.
     """
 
-    def __init__(self, c_log_level=LOG_LEVEL_INFO, auto_reconnect=True, reconnect_interval=30):
-        if not IS_INTERFACE_READY:
+    # Cache de logger.isEnabledFor(DEBUG) para os caminhos quentes (frame/status).
+    # Reavaliado pela thread de consumo a cada lote, então mudanças de nível valem
+    # logo em seguida.
+    _debug_enabled = False
+
+    def __init__(self, c_log_level=LOG_LEVEL_INFO, auto_reconnect=True, reconnect_interval=30,
+                 frame_worker_threads=False, copy_buffer_count=0):
+        if not c_interface.IS_INTERFACE_READY:
             logger.critical(
                 "Biblioteca C não está carregada ou inicializada corretamente. Saindo."
             )
             raise ImportError("Falha ao carregar ou definir funções da biblioteca C.")
 
-        self.c_lib = C_LIBRARY
+        self.c_lib = c_interface.C_LIBRARY
+        # Funções C pré-resolvidas (sem getattr no CDLL a cada chamada)
+        self._add_camera_c = c_interface.processor_add_camera
+        self._stop_camera_c = c_interface.processor_stop_camera
         self._c_log_level = c_log_level
-        self.status_queue = queue.Queue(maxsize=100)  # Fila para atualizações de status
-
-        # Dicionário para armazenar o ÚLTIMO frame recebido por câmera
-        self._latest_frames = {}
-        self._latest_frames_lock = threading.Lock()
+        # Anel de atualizações de status, lido com get_status(). deque.append é
+        # atômico e, com maxlen, descarta a mais antiga em O(1) sem lock; o Event
+        # só acorda quem espera em get_status.
+        self._status_ring = collections.deque(maxlen=STATUS_QUEUE_MAXSIZE)
+        self._status_event = threading.Event()
+
+        # Estado por frame em listas indexadas pelo camera_id (0 <= id < MAX_CAMERAS,
+        # o mesmo slot do C): acesso direto sem hash nem lock, já que trocar um
+        # item de lista é atômico. _latest_frames guarda o ÚLTIMO frame por câmera.
+        self._latest_frames = [None] * MAX_CAMERAS
+        # Último layout validado por câmera: (width, height, pixel_format, linesize,
+        # data_buffer_size) e o buffer_size calculado. Enquanto o cabeçalho não muda
+        # (o normal após os primeiros frames), _validate_frame não é chamado.
+        self._frame_layouts = [None] * MAX_CAMERAS
+        # Anéis de arrays de cópia por câmera (copy_buffer_count > 0, ver
+        # release_copy_buffer); com 0, cada frame copiado ganha um array novo
+        self._copy_buffer_count = copy_buffer_count
+        self._copy_rings = [None] * MAX_CAMERAS
 
         # Dicionários para armazenar informações e callbacks
         self._active_cameras = {}
-        self._frame_callbacks = {}
+        # Alterados sob _state_lock e lidos sem lock pelas threads de frame/status.
+        # _status_callbacks é copy-on-write: quem altera troca o dict inteiro.
+        self._frame_callbacks = [None] * MAX_CAMERAS
         self._status_callbacks = {}
         self._processor_initialized = False
         self._state_lock = threading.Lock()
 
-        # --- Callbacks Ctypes ---
-        self._c_status_callback_ref = STATUS_CALLBACK_FUNC_TYPE(self._c_status_callback)
-        self._c_frame_callback_ref = FRAME_CALLBACK_FUNC_TYPE(self._c_frame_callback)
+        # Threads de entrega por câmera (opcional, ver docstring da classe)
+        self._frame_worker_threads = frame_worker_threads
+        self._frame_workers = [None] * MAX_CAMERAS
+        CameraProcessor._debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         # Configurações de reconexão automática
         self._auto_reconnect = auto_reconnect
         self._reconnect_interval = reconnect_interval  # segundos
         self._monitor_thread = None
-        self._monitor_running = False
+        # set() interrompe a espera entre ciclos da thread de monitoramento
+        self._monitor_stop_event = threading.Event()
         self._last_reconnect_attempt = {}  # Rastrear última tentativa de reconexão por câmera
+        # IDs com último status STATUS_DISCONNECTED, mantido pelo callback de status
+        # (add/discard são atômicos sob a GIL): o monitor não varre _active_cameras
+        self._disconnected_cameras = set()
 
         # Inicializar a biblioteca C
         self.initialize_c_library()
@@ -101,6 +642,21 @@ class CameraProcessor:
         """NumPy está sempre disponível agora como dependência obrigatória."""
         return True
 
+    @property
+    def status_queue(self):
+        """
+        Obsoleto: use get_status() ou get_status_batch().
+
+        Mantido para código que lia a antiga queue.Queue de status com get,
+        get_nowait, empty ou qsize; as leituras vêm do mesmo anel de get_status.
+        """
+        warnings.warn(
+            "CameraProcessor.status_queue está obsoleto; use get_status() ou get_status_batch().",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return _StatusQueueView(self)
+
     def initialize_c_library(self):
         """Inicializa a biblioteca C globalmente (FFmpeg, etc.)."""
         with self._state_lock:  # Usar o lock de estado
@@ -118,8 +674,8 @@ class CameraProcessor:
                 )
                 self.c_lib.logger_set_level(self._c_log_level)
 
-                logger.info("Chamando processor_initialize...")
-                ret = self.c_lib.processor_initialize()
+                logger.info("Chamando processor_initialize (compartilhado entre instâncias)...")
+                ret = _RUNTIME.acquire(self.c_lib)
                 if ret == 0:
                     logger.info("Biblioteca C inicializada com sucesso.")
                     self._processor_initialized = True
@@ -138,194 +694,206 @@ class CameraProcessor:
     def _c_status_callback(self, camera_id, status_code, message_ptr, user_data):
         """Callback C para status. Coloca na fila Python e atualiza estado interno."""
         try:
-            message = message_ptr.decode("utf-8", "ignore") if message_ptr else ""
-            logger.debug(
-                f"[Callback Status] Recebido: ID={camera_id}, Code={status_code}, Msg='{message}'"
-            )
+            # Leitura sem lock do snapshot copy-on-write
+            status_callback = self._status_callbacks.get(camera_id)
+
+            # Mensagens fixas já vêm internadas; só as formatadas (ou pedidas em
+            # bruto pelo callback) são decodificadas da string C
+            message = _KNOWN_STATUS_MESSAGES.get(status_code)
+            if status_callback is not None and getattr(status_callback, "wants_raw_message", False):
+                message = None
+            if message is None:
+                message = (
+                    ctypes.string_at(message_ptr).decode("utf-8", "ignore")
+                    if message_ptr
+                    else ""
+                )
+            if self._debug_enabled:
+                logger.debug(
+                    "[Callback Status] Recebido: ID=%s, Code=%s, Msg='%s'",
+                    camera_id, status_code, message,
+                )
+
+            # Atualizar estado interno sem _state_lock: dict.get e a atribuição no
+            # dict da câmera são atômicos, e quem remove a câmera (sob o lock) só
+            # descarta o dict, então no pior caso o status vai para um dict órfão
+            camera_info = self._active_cameras.get(camera_id)
+            if camera_info is not None:
+                camera_info["status"] = status_code
+                if status_code == STATUS_DISCONNECTED:
+                    self._disconnected_cameras.add(camera_id)
+                else:
+                    self._disconnected_cameras.discard(camera_id)
 
-            status_info = {
+            # Chamar o callback de status registrado para esta câmera, se existir
+            if status_callback is not None:
+                try:
+                    status_callback.update_status(camera_id, status_code, message)
+                except Exception as callback_error:
+                    logger.error(
+                        "Erro ao executar callback de status para câmera ID %s: %s",
+                        camera_id, callback_error,
+                    )
+
+            self._status_ring.append({
                 "camera_id": camera_id,
                 "status_code": status_code,
                 "message": message,
-            }
+            })
+            self._status_event.set()
 
-            # Atualizar estado interno
-            with self._state_lock:
-                if camera_id in self._active_cameras:
-                    self._active_cameras[camera_id]["status"] = status_code
-
-                # Chamar o callback de status registrado para esta câmera, se existir
-                if (
-                    camera_id in self._status_callbacks
-                    and self._status_callbacks[camera_id] is not None
-                ):
-                    try:
-                        self._status_callbacks[camera_id].update_status(
-                            camera_id, status_code, message
-                        )
-                    except Exception as callback_error:
-                        logger.error(
-                            f"Erro ao executar callback de status para câmera ID {camera_id}: {callback_error}"
-                        )
-
-            self.status_queue.put_nowait(status_info)
-
-        except queue.Full:
-            logger.warning(
-                f"Fila de status cheia para ID {camera_id}, descartando atualização."
-            )
         except Exception as e:
             logger.exception(
-                f"Erro inesperado no callback de status para ID {camera_id}: {e}"
+                "Erro inesperado no callback de status para ID %s: %s", camera_id, e
             )
 
-    def _c_frame_callback(self, frame_data_ptr, user_data):
+    def _stop_frame_workers(self):
+        """Encerra as threads de entrega por câmera (frame_worker_threads=True)."""
+        with self._state_lock:
+            workers = [w for w in self._frame_workers if w is not None]
+            self._frame_workers = [None] * MAX_CAMERAS
+        for worker in workers:
+            worker.stop()
+
+    def _handle_c_frame(self, frame_addr, header, returns, pool_state,
+                        _now=time.time, _raw_type=RawBufferFrameCallback):
         """
-        Callback C para frames. Copia dados, libera memória C, armazena no buffer de último frame.
+        Processa um frame retirado da fila C. Entrega ao usuário uma view sem cópia do buffer C
+        (devolvido ao pool quando o array é liberado) e armazena no buffer de último frame.
+
+        Args:
+            frame_addr: Endereço do item do pool (CallbackFrameData*).
+            header: Tupla de CALLBACK_FRAME_HEADER com os campos do item.
+            returns: Lista do lote atual; itens que não viram view são anexados a
+                ela como (frame_addr, data_addr) e devolvidos ao pool pelo laço de
+                consumo, em lote.
+            pool_state: _PoolState do pool de onde o item veio.
+            _now, _raw_type: Referências fixadas na definição (evita lookups globais
+                por frame); não devem ser passadas.
         """
-        should_free_c_mem = bool(frame_data_ptr)
+        should_free_c_mem = bool(frame_addr)
         cam_id_log = -1
+        c_data_ptr = None
 
         try:
-            if not frame_data_ptr:
+            if not frame_addr:
                 logger.warning("[Callback Frame] Ponteiro de frame NULO recebido.")
                 return
 
-            frame_data = frame_data_ptr.contents
-            cam_id = frame_data.camera_id
+            (width, height, pixel_format, pts, cam_id, _ref_count,
+             c_data_ptr, linesize, data_buffer_size) = header
             cam_id_log = cam_id
-            width = frame_data.width
-            height = frame_data.height
-            pts = frame_data.pts
-            linesize = frame_data.linesize[0]
-            c_data_ptr = frame_data.data[0]
-
-            logger.debug(
-                f"[Callback Frame] Recebido ID:{cam_id} {width}x{height} PTS:{pts} Linesize:{linesize} Format:{frame_data.format}"
-            )
-
-            # Verificar se a câmera ainda está ativa antes de prosseguir
-            with self._state_lock:
-                if cam_id not in self._active_cameras:
-                    logger.warning(
-                        f"[Callback Frame ID {cam_id}] Recebido frame para câmera inativa/removida. Descartando."
-                    )
-                    if should_free_c_mem:
-                        self.c_lib.callback_pool_return_data(frame_data_ptr)
-                    return
 
-            # 2. Validar dados básicos
-            if width <= 0 or height <= 0 or linesize <= 0 or not c_data_ptr:
-                logger.error(
-                    f"[Callback Frame ID {cam_id}] Frame com dados/dims/linesize inválidos: {width}x{height}, L:{linesize}, Ptr:{c_data_ptr}"
+            # Log de todo frame: só a checagem do atributo quando DEBUG está desligado
+            if self._debug_enabled:
+                logger.debug(
+                    "[Callback Frame] Recebido ID:%s %sx%s PTS:%s Linesize:%s Format:%s",
+                    cam_id, width, height, pts, linesize, pixel_format,
                 )
-                if should_free_c_mem:
-                    self.c_lib.callback_pool_return_data(frame_data_ptr)
-                return
-            if frame_data.format != AV_PIX_FMT_BGR24:
+
+            # 1-3. Câmera ativa e cabeçalho válido; qualquer falha cai na mesma
+            # saída, que devolve o item ao pool em um único ponto.
+            # Leitura sem lock: cada slot é trocado atomicamente por register/stop
+            frame_callback = self._frame_callbacks[cam_id]
+            if frame_callback is None:
+                error = "câmera inativa/removida"
+            else:
+                layout_key = (width, height, pixel_format, linesize, data_buffer_size)
+                layout = self._frame_layouts[cam_id]
+                if layout is not None and layout[0] == layout_key and c_data_ptr:
+                    # Mesmo layout do último frame válido: já validado
+                    buffer_size = layout[1]
+                    error = None
+                else:
+                    buffer_size, error = _validate_frame(
+                        width, height, pixel_format, linesize, c_data_ptr, data_buffer_size
+                    )
+                    # Renegociação do stream (ou primeiro frame): novo layout
+                    self._frame_layouts[cam_id] = (
+                        (layout_key, buffer_size) if error is None else None
+                    )
+            if error is not None:
                 logger.warning(
-                    f"[Callback Frame ID {cam_id}] Formato inesperado {frame_data.format}, esperado {AV_PIX_FMT_BGR24}."
+                    "[Callback Frame ID %s] Frame descartado: %s.", cam_id, error
                 )
-                if should_free_c_mem:
-                    self.c_lib.callback_pool_return_data(frame_data_ptr)
+                should_free_c_mem = False
+                returns.append((frame_addr, c_data_ptr))
                 return
 
-            # 3. Calcular tamanho e obter ponteiro para dados do plano 0
-            expected_bytes_per_pixel = 3
-            buffer_size = height * linesize
-            if buffer_size <= 0:
-                logger.error(
-                    f"[Callback Frame ID {cam_id}] Tamanho de buffer inválido calculado: {buffer_size}"
+            is_raw = isinstance(frame_callback, _raw_type)
+            if not getattr(frame_callback, "wants_zero_copy", True):
+                # 4a. Callback pediu cópia: copiar direto do buffer C com memmove para
+                # um array novo (o usuário pode guardá-lo à vontade); o item não é mais
+                # usado e volta ao pool com o resto do lote.
+                frame_data_obj = _copy_frame(
+                    c_data_ptr, width, height, pixel_format, buffer_size, is_raw,
+                    None if is_raw or not self._copy_buffer_count
+                    else self._copy_buffer(cam_id, width, height, pixel_format),
                 )
-                if should_free_c_mem:
-                    self.c_lib.callback_pool_return_data(frame_data_ptr)
-                return
-
-            # Criar array NumPy (NumPy é dependência obrigatória agora)
-            # 4. Criar buffer ctypes a partir do ponteiro C (APENAS para acesso)
-            c_buffer = ctypes.cast(
-                c_data_ptr, ctypes.POINTER(ctypes.c_uint8 * buffer_size)
-            ).contents
-
-            # 5. Copiar dados para array NumPy
-            frame_np = np.empty(
-                (height, width, expected_bytes_per_pixel), dtype=np.uint8
-            )
-            temp_view = np.frombuffer(c_buffer, dtype=np.uint8).reshape(
-                (height, linesize)
-            )
-            # Copia os dados relevantes, ignorando o padding se houver
-            frame_np[:, :, :] = temp_view[
-                :, : width * expected_bytes_per_pixel
-            ].reshape((height, width, expected_bytes_per_pixel))
-            frame_data_obj = frame_np
-
-            # 6. LIBERAR MEMÓRIA C IMEDIATAMENTE APÓS A CÓPIA!
-            self.c_lib.callback_pool_return_data(frame_data_ptr)
-            should_free_c_mem = False
-            frame_data_ptr = None
-
-            # 7. Criar dicionário Python com a cópia dos dados
+                returns.append((frame_addr, c_data_ptr))
+                should_free_c_mem = False
+            else:
+                # 4b. Criar view sobre o buffer C (sem cópia). A posse do item do pool
+                # passa para a view: ele é devolvido quando ela (e derivados) morrer.
+                frame_data_obj = _wrap_buffer(frame_addr, c_data_ptr, buffer_size, pool_state)
+                should_free_c_mem = False
+                if not is_raw:
+                    frame_data_obj = _wrap_frame(frame_data_obj, width, height, pixel_format)
+
+            # 5. Criar dicionário Python com a view do frame
             frame_info = {
                 "frame": frame_data_obj,
                 "pts": pts,
-                "timestamp": time.time(),
+                "timestamp": _now(),
                 "width": width,
                 "height": height,
             }
 
-            # Armazenar no dicionário de último frame (SOBRESCREVER)
-            with self._latest_frames_lock:
-                self._latest_frames[cam_id] = frame_info
-
-            # Chamar o callback registrado para esta câmera - OBRIGATÓRIO TER UM CALLBACK
-            with self._state_lock:
-                if (
-                    cam_id in self._frame_callbacks
-                    and self._frame_callbacks[cam_id] is not None
-                ):
-                    try:
-                        # Executar o callback com o frame
-                        self._frame_callbacks[cam_id].process_frame(
-                            cam_id, frame_data_obj
-                        )
-                    except Exception as callback_error:
-                        logger.error(
-                            f"Erro ao executar callback de frame para câmera ID {cam_id}: {callback_error}"
-                        )
-                else:
-                    logger.warning(
-                        f"Nenhum callback de frame registrado para câmera ID {cam_id}"
+            # Armazenar no slot de último frame (SOBRESCREVER)
+            self._latest_frames[cam_id] = frame_info
+
+            # Chamar o callback registrado para esta câmera. Fora do _state_lock:
+            # um callback lento não pode travar os callbacks de status das threads C.
+            worker = self._frame_workers[cam_id]
+            if worker is not None:
+                # Thread própria da câmera: aqui só se publica o frame
+                if worker.submit(frame_data_obj) and self._debug_enabled:
+                    logger.debug(
+                        "[Callback Frame ID %s] Callback atrasado; frame pendente substituído.",
+                        cam_id,
                     )
+                return
+            try:
+                frame_callback.process_frame(cam_id, frame_data_obj)
+            except Exception as callback_error:
+                logger.error(
+                    "Erro ao executar callback de frame para câmera ID %s: %s",
+                    cam_id, callback_error,
+                )
 
-        except queue.Full:
-            logger.warning(
-                f"[Callback Frame ID {cam_id_log}] Frame queue cheia. Frame descartado."
-            )
-            if should_free_c_mem:
-                try:
-                    # Devolver ao pool mesmo em erro de fila
-                    self.c_lib.callback_pool_return_data(frame_data_ptr)
-                except Exception as free_err:
-                    logger.exception(
-                        f"Erro ao tentar liberar C frame após Queue Full (pré-cópia): {free_err}"
-                    )
         except Exception as e:
             logger.exception(
-                f"[Callback Frame ERROR ID {cam_id_log}] Exceção no callback de frame: {e}"
+                "[Callback Frame ERROR ID %s] Exceção no callback de frame: %s", cam_id_log, e
             )
             if should_free_c_mem:
-                try:
-                    # Devolver ao pool mesmo em erro de callback
-                    self.c_lib.callback_pool_return_data(frame_data_ptr)
-                except Exception as free_err:
-                    logger.exception(
-                        f"Erro ao tentar liberar C frame após exceção: {free_err}"
-                    )
+                # Devolver ao pool mesmo em erro de callback, com o resto do lote
+                returns.append((frame_addr, c_data_ptr))
+
+    def _copy_buffer(self, cam_id, width, height, pixel_format):
+        """
+        Array do anel da câmera para a próxima cópia, ou None (array novo). O anel
+        é recriado quando o shape muda; arrays do anel anterior ficam com o usuário.
+        """
+        shape = _frame_shape(width, height, pixel_format)
+        ring = self._copy_rings[cam_id]
+        if ring is None or ring.shape != shape:
+            ring = self._copy_rings[cam_id] = _CopyBufferRing(shape, self._copy_buffer_count)
+        latest = self._latest_frames[cam_id]
+        return ring.acquire(latest["frame"] if latest is not None else None)
 
     def _adapt_frame_callback(self, callback):
         """Converte uma função de callback em um objeto FrameCallback."""
-        if isinstance(callback, FrameCallback):
+        if isinstance(callback, (FrameCallback, RawBufferFrameCallback)):
             return callback
         elif callable(callback):
             return SimpleFrameCallback(callback)
@@ -347,11 +915,12 @@ class CameraProcessor:
         self,
         camera_id: int,  # ID fornecido pelo Python
         url: str,
-        frame_callback: Union[FrameCallback, LegacyFrameCallbackFunc],
+        frame_callback: Union[FrameCallback, RawBufferFrameCallback, LegacyFrameCallbackFunc],
         status_callback: Optional[
             Union[StatusCallback, LegacyStatusCallbackFunc]
         ] = None,
         target_fps: int = 1,
+        pixel_format: int = AV_PIX_FMT_BGR24,
     ) -> int:
         """
         Registra uma nova câmera usando um ID fornecido externamente.
@@ -359,9 +928,12 @@ class CameraProcessor:
         Args:
             camera_id: O ID a ser usado para esta câmera (definido pelo chamador).
             url: URL da câmera (RTMP, HLS, RTSP, etc.)
-            frame_callback: Interface FrameCallback ou função para frames (OBRIGATÓRIO).
+            frame_callback: Interface FrameCallback (np.ndarray), RawBufferFrameCallback
+                (memoryview) ou função para frames (OBRIGATÓRIO).
             status_callback: Interface StatusCallback ou função para status (OPCIONAL).
             target_fps: Taxa de quadros alvo (0 para máxima)
+            pixel_format: AV_PIX_FMT_BGR24 (padrão, array (h, w, 3)) ou AV_PIX_FMT_YUV420P
+                (array I420 (h * 3 // 2, w), sem conversão de cor no C; ver BGRFrameCallback)
 
         Retorna:
             0 em sucesso, ou um código de erro C (< 0).
@@ -396,11 +968,19 @@ class CameraProcessor:
                 logger.error("URL inválida fornecida para register_camera.")
                 return -3
             
-            # Verificar se o ID já está em uso
-            if camera_id in self._active_cameras:
+            if not 0 <= camera_id < MAX_CAMERAS:
+                logger.error(f"ID de câmera {camera_id} fora do intervalo [0, {MAX_CAMERAS}).")
+                return -4
+
+            # Verificar se o ID já está em uso (nesta ou em outra instância)
+            if camera_id in self._active_cameras or _STATUS_TARGETS[camera_id] not in (None, self):
                 logger.error(f"Tentativa de registrar câmera com ID {camera_id} que já está ativo.")
                 return -4 # Código de erro para ID duplicado
 
+            if pixel_format not in (AV_PIX_FMT_BGR24, AV_PIX_FMT_YUV420P):
+                logger.error(f"Formato de pixel não suportado: {pixel_format}")
+                return -3
+
             effective_target_fps = int(target_fps) if target_fps > 0 else 0
             logger.info(
                 f"Solicitando adição da câmera: ID={camera_id}, URL='{url}', TargetFPS={effective_target_fps}"
@@ -408,15 +988,21 @@ class CameraProcessor:
 
             try:
                 c_url = url.encode("utf-8")
-                # Chamar a função C passando o camera_id
-                ret = self.c_lib.processor_add_camera(
-                    ctypes.c_int(camera_id), # Passa o ID fornecido
+                # Antes da chamada C: a thread da câmera pode reportar status (e
+                # entregar frames) logo ao iniciar
+                _STATUS_TARGETS[camera_id] = self
+                _FRAME_TARGETS[camera_id] = self
+                # Chamar a função C passando o camera_id. Os argtypes já estão
+                # declarados em c_interface: ints Python vão direto, sem wrappers c_int.
+                ret = self._add_camera_c(
+                    camera_id, # Passa o ID fornecido
                     c_url,
-                    self._c_status_callback_ref,
-                    self._c_frame_callback_ref,
-                    ctypes.py_object(self),  # user_data para status_cb
-                    ctypes.py_object(self),  # user_data para frame_cb
-                    ctypes.c_int(effective_target_fps),
+                    _STATUS_TRAMPOLINE,
+                    _NULL_FRAME_CALLBACK,
+                    None,  # user_data para status_cb (despacho por camera_id)
+                    None,  # user_data para frame_cb (não usado)
+                    effective_target_fps,
+                    pixel_format,
                 )
 
                 if ret == 0:
@@ -427,13 +1013,29 @@ class CameraProcessor:
                     self._active_cameras[camera_id] = {
                         "url": url,
                         "target_fps": effective_target_fps,
+                        "pixel_format": pixel_format,
                         "status": STATUS_CONNECTING,
                     }
+                    # Slots por câmera limpos: nada de frame/layout de um registro anterior
+                    self._latest_frames[camera_id] = None
+                    self._frame_layouts[camera_id] = None
+                    self._copy_rings[camera_id] = None
+                    if self._frame_worker_threads:
+                        old_worker = self._frame_workers[camera_id]
+                        if old_worker is not None:
+                            old_worker.stop(join=False)
+                        self._frame_workers[camera_id] = _FrameWorker(
+                            camera_id, adapted_frame_callback
+                        )
                     self._frame_callbacks[camera_id] = adapted_frame_callback
                     if adapted_status_callback is not None:
-                        self._status_callbacks[camera_id] = adapted_status_callback
+                        self._status_callbacks = {
+                            **self._status_callbacks, camera_id: adapted_status_callback
+                        }
                     return 0 # Retorna 0 para sucesso
                 else:
+                    _STATUS_TARGETS[camera_id] = None
+                    _FRAME_TARGETS[camera_id] = None
                     # Erros C: -1 (init), -3 (url), -4(id), -5 (thread), outros...
                     logger.error(
                         f"Falha ao adicionar câmera ID {camera_id} via C (Erro {ret}). URL: {url}"
@@ -441,6 +1043,8 @@ class CameraProcessor:
                     return ret  # Retorna o código de erro C
 
             except Exception as e:
+                _STATUS_TARGETS[camera_id] = None
+                _FRAME_TARGETS[camera_id] = None
                 logger.exception(
                     f"Exceção Python ao chamar processor_add_camera para ID {camera_id}, URL {url}: {e}"
                 )
@@ -461,6 +1065,11 @@ class CameraProcessor:
         logger.info(f"Solicitando parada para câmera ID {camera_id} (com timeout de segurança)...")
         with self._state_lock:
             if camera_id not in self._active_cameras:
+                if 0 <= camera_id < MAX_CAMERAS and _STATUS_TARGETS[camera_id] not in (None, self):
+                    logger.error(
+                        f"Câmera ID {camera_id} pertence a outra instância de CameraProcessor."
+                    )
+                    return False
                 logger.warning(
                     f"Tentando parar câmera ID {camera_id} que não está sendo rastreada pelo Python."
                 )
@@ -472,7 +1081,7 @@ class CameraProcessor:
 
         try:
             logger.debug(f"Chamando processor_stop_camera (com timeout) para ID {camera_id}...")
-            ret = self.c_lib.processor_stop_camera(camera_id)
+            ret = self._stop_camera_c(camera_id)
             if ret == 0:
                 logger.info(
                     f"Câmera ID {camera_id} parada com sucesso (thread finalizada ou timeout de segurança)."
@@ -482,25 +1091,33 @@ class CameraProcessor:
                 # Remover completamente a câmera do sistema (ação explícita do usuário)
                 # Remover os callbacks registrados E a entrada da câmera ativa
                 with self._state_lock:
+                    _STATUS_TARGETS[camera_id] = None
+                    _FRAME_TARGETS[camera_id] = None
+                    worker = self._frame_workers[camera_id]
+                    self._frame_workers[camera_id] = None
                     removed_items = []
                     if camera_id in self._active_cameras: # Verifica se realmente existe antes de tentar deletar
                         del self._active_cameras[camera_id]
                         removed_items.append("active_cameras")
-                    if camera_id in self._frame_callbacks:
-                        del self._frame_callbacks[camera_id]
+                    self._disconnected_cameras.discard(camera_id)
+                    if self._frame_callbacks[camera_id] is not None:
+                        self._frame_callbacks[camera_id] = None
                         removed_items.append("frame_callbacks")
                     if camera_id in self._status_callbacks:
-                        del self._status_callbacks[camera_id]
+                        self._status_callbacks = _dict_without(self._status_callbacks, camera_id)
                         removed_items.append("status_callbacks")
                     
                     if removed_items:
                         logger.debug(f"Estado Python limpo para ID {camera_id}: {', '.join(removed_items)}")
 
+                # Fora do lock: o join espera o callback em andamento terminar
+                if worker is not None:
+                    worker.stop()
+
                 # Limpar o buffer de últimos frames para esta câmera
-                with self._latest_frames_lock:
-                    if camera_id in self._latest_frames:
-                        del self._latest_frames[camera_id]
-                        logger.debug(f"Buffer de últimos frames limpo para ID {camera_id}")
+                if self._latest_frames[camera_id] is not None:
+                    self._latest_frames[camera_id] = None
+                    logger.debug(f"Buffer de últimos frames limpo para ID {camera_id}")
 
                 return True
             elif ret == -1:
@@ -513,16 +1130,24 @@ class CameraProcessor:
                     if camera_id in self._active_cameras:
                         del self._active_cameras[camera_id]
                         logger.debug(f"Estado Python limpo para ID {camera_id} (ID inválido no C)")
-                    if camera_id in self._frame_callbacks:
-                        del self._frame_callbacks[camera_id]
+                    self._disconnected_cameras.discard(camera_id)
+                    worker = None
+                    if 0 <= camera_id < MAX_CAMERAS:
+                        self._frame_callbacks[camera_id] = None
+                        _STATUS_TARGETS[camera_id] = None
+                        _FRAME_TARGETS[camera_id] = None
+                        worker = self._frame_workers[camera_id]
+                        self._frame_workers[camera_id] = None
                     if camera_id in self._status_callbacks:
-                        del self._status_callbacks[camera_id]
+                        self._status_callbacks = _dict_without(self._status_callbacks, camera_id)
+
+                if worker is not None:
+                    worker.stop()
                 
                 # Limpar o buffer de últimos frames para esta câmera mesmo em caso de erro
-                with self._latest_frames_lock:
-                    if camera_id in self._latest_frames:
-                        del self._latest_frames[camera_id]
-                        logger.debug(f"Buffer de últimos frames limpo para ID {camera_id} (ID inválido no C)")
+                if 0 <= camera_id < MAX_CAMERAS and self._latest_frames[camera_id] is not None:
+                    self._latest_frames[camera_id] = None
+                    logger.debug(f"Buffer de últimos frames limpo para ID {camera_id} (ID inválido no C)")
                 
                 return False
             elif ret == -3:
@@ -541,7 +1166,10 @@ class CameraProcessor:
             return False
 
     def shutdown(self):
-        """Desliga o processador C e limpa recursos Python."""
+        """
+        Para as câmeras desta instância e limpa recursos Python. O processador C só é
+        desligado (processor_shutdown) se esta for a última instância em uso.
+        """
         logger.info("Iniciando desligamento do CameraProcessor (Python)...")
         
         # Parar a thread de monitoramento primeiro
@@ -549,12 +1177,32 @@ class CameraProcessor:
             logger.info("Parando thread de monitoramento...")
             self._stop_monitor_thread()
         
-        # Chamar shutdown C primeiro
-        if self._processor_initialized and self.c_lib:
-            logger.info("Chamando processor_shutdown na biblioteca C...")
+        # A thread de consumo é compartilhada: sem dono no slot, os frames destas
+        # câmeras passam a ser descartados por ela
+        with self._state_lock:
+            own_cameras = list(self._active_cameras)
+            for camera_id, target in enumerate(_FRAME_TARGETS):
+                if target is self:
+                    _FRAME_TARGETS[camera_id] = None
+            release = self._processor_initialized
+            self._processor_initialized = False
+        self._stop_frame_workers()
+
+        # Soltar os últimos frames antes do shutdown C, enquanto o pool ainda
+        # existe, para que seus itens sejam devolvidos normalmente.
+        self._latest_frames = [None] * MAX_CAMERAS
+
+        # Chamar shutdown C primeiro (ou só parar as câmeras desta instância)
+        if release and self.c_lib:
+            logger.info("Liberando processador C (processor_shutdown se for a última instância)...")
             try:
-                ret = self.c_lib.processor_shutdown()
-                if ret == 0:
+                ret = _RUNTIME.release(self.c_lib, own_cameras)
+                if ret is None:
+                    logger.info(
+                        f"Processador C segue em uso por outras instâncias; "
+                        f"{len(own_cameras)} câmeras desta instância paradas."
+                    )
+                elif ret == 0:
                     logger.info("processor_shutdown C concluído com sucesso.")
                 else:
                     logger.error(f"processor_shutdown C retornou um erro: {ret}")
@@ -571,32 +1219,19 @@ class CameraProcessor:
                 f"Limpando estado interno Python ({len(self._active_cameras)} câmeras rastreadas)."
             )
             self._active_cameras.clear()
-            self._frame_callbacks.clear()
-            self._status_callbacks.clear()
-            self._processor_initialized = False
+            for camera_id, target in enumerate(_STATUS_TARGETS):
+                if target is self:
+                    _STATUS_TARGETS[camera_id] = None
+            self._frame_callbacks = [None] * MAX_CAMERAS
+            self._status_callbacks = {}
             self._last_reconnect_attempt.clear()
+            self._disconnected_cameras.clear()
 
-        # Limpar o buffer de últimos frames
-        with self._latest_frames_lock:
-            logger.info(
-                f"Limpando buffer de últimos frames ({len(self._latest_frames)} câmeras)."
-            )
-            self._latest_frames.clear()
-
-        # Limpar APENAS a fila de status
-        q_names = {"Status": self.status_queue}
-        for name, q in q_names.items():
-            cleared_count = 0
-            while not q.empty():
-                try:
-                    q.get_nowait()
-                    cleared_count += 1
-                except queue.Empty:
-                    break
-                except Exception as e_q:
-                    logger.error(f"Erro ao limpar fila {name}: {e_q}")
-                    break  # Parar se houver erro
-            logger.info(f"Fila '{name}' limpa ({cleared_count} itens removidos).")
+        # Limpar APENAS o anel de status
+        cleared_count = len(self._status_ring)
+        self._status_ring.clear()
+        self._status_event.clear()
+        logger.info(f"Fila 'Status' limpa ({cleared_count} itens removidos).")
 
         logger.info("Desligamento do CameraProcessor (Python) concluído.")
         
@@ -608,7 +1243,7 @@ class CameraProcessor:
             logger.warning("Thread de monitoramento já está em execução.")
             return
             
-        self._monitor_running = True
+        self._monitor_stop_event.clear()
         self._monitor_thread = threading.Thread(
             target=self._monitor_cameras,
             name="CameraMonitor",
@@ -624,7 +1259,7 @@ class CameraProcessor:
             return
             
         logger.info("Solicitando parada da thread de monitoramento...")
-        self._monitor_running = False
+        self._monitor_stop_event.set()
         
         # Aguardar a thread terminar com timeout
         self._monitor_thread.join(timeout=3.0)
@@ -642,28 +1277,34 @@ class CameraProcessor:
         """
         logger.info("Thread de monitoramento de câmeras iniciada.")
         
-        while self._monitor_running:
+        stop_event = self._monitor_stop_event
+        while not stop_event.is_set():
             try:
                 # Verificar câmeras desconectadas
                 disconnected_cameras = []
                 
-                with self._state_lock:
-                    # Verificar apenas se o processador está inicializado
-                    if not self._processor_initialized:
-                        time.sleep(self._reconnect_interval)
-                        continue
-                        
-                    # Coletar câmeras desconectadas
+                # Verificar apenas se o processador está inicializado. Se não
+                # estiver, só espera o próximo ciclo (abaixo)
+                if self._processor_initialized:
+                    # Coletar câmeras desconectadas: só as marcadas pelo callback de
+                    # status, com o _state_lock tomado brevemente para cada uma
                     current_time = time.time()
-                    for camera_id, camera_info in self._active_cameras.items():
-                        if camera_info["status"] == STATUS_DISCONNECTED:
-                            # Verificar se já passou tempo suficiente desde a última tentativa
-                            last_attempt = self._last_reconnect_attempt.get(camera_id, 0)
-                            if current_time - last_attempt >= self._reconnect_interval:
-                                disconnected_cameras.append((camera_id, camera_info))
+                    for camera_id in list(self._disconnected_cameras):
+                        # Verificar se já passou tempo suficiente desde a última tentativa
+                        last_attempt = self._last_reconnect_attempt.get(camera_id, 0)
+                        if current_time - last_attempt < self._reconnect_interval:
+                            continue
+                        with self._state_lock:
+                            camera_info = self._active_cameras.get(camera_id)
+                        if camera_info is None:
+                            self._disconnected_cameras.discard(camera_id)
+                        elif camera_info["status"] == STATUS_DISCONNECTED:
+                            disconnected_cameras.append((camera_id, camera_info))
                 
                 # Tentar reconectar câmeras desconectadas
                 for camera_id, camera_info in disconnected_cameras:
+                    if stop_event.is_set():
+                        break
                     logger.info(f"Tentando reconectar câmera ID {camera_id}...")
                     self._last_reconnect_attempt[camera_id] = time.time()
                     
@@ -674,12 +1315,15 @@ class CameraProcessor:
                     else:
                         logger.warning(f"Falha ao reconectar câmera ID {camera_id}. Tentando novamente em {self._reconnect_interval}s.")
                 
-                # Dormir até o próximo ciclo
-                time.sleep(self._reconnect_interval)
+                # Dormir até o próximo ciclo; retorna na hora se a parada for pedida
+                if stop_event.wait(self._reconnect_interval):
+                    break
                 
             except Exception as e:
                 logger.exception(f"Erro na thread de monitoramento: {e}")
-                time.sleep(self._reconnect_interval)  # Continuar mesmo após erro
+                # Continuar mesmo após erro
+                if stop_event.wait(self._reconnect_interval):
+                    break
         
         logger.info("Thread de monitoramento de câmeras encerrada.")
     
@@ -702,19 +1346,20 @@ class CameraProcessor:
                 
             url = camera_info["url"]
             target_fps = camera_info.get("target_fps", 1)
+            pixel_format = camera_info.get("pixel_format", AV_PIX_FMT_BGR24)
             
             # Verificar se os callbacks ainda existem
-            if camera_id not in self._frame_callbacks:
+            frame_callback = self._frame_callbacks[camera_id]
+            if frame_callback is None:
                 logger.error(f"Callback de frame não encontrado para câmera ID {camera_id}")
                 return False
                 
-            frame_callback = self._frame_callbacks[camera_id]
             status_callback = self._status_callbacks.get(camera_id)
             
             # Primeiro, garantir que a câmera está completamente parada no lado C
             logger.debug(f"Parando thread C da câmera ID {camera_id} antes de reconectar...")
             # Chamar diretamente a função C para parar a thread, sem remover do sistema Python
-            self.c_lib.processor_stop_camera(camera_id)
+            self._stop_camera_c(camera_id)
             
             # Pequena pausa para garantir que a câmera foi parada
             time.sleep(1.0)
@@ -726,7 +1371,8 @@ class CameraProcessor:
                 url=url,
                 frame_callback=frame_callback,
                 status_callback=status_callback,
-                target_fps=target_fps
+                target_fps=target_fps,
+                pixel_format=pixel_format,
             )
             
             return ret == 0  # Sucesso se register_camera retornar 0
@@ -776,11 +1422,12 @@ class CameraProcessor:
                 
             # Parar a thread C da câmera, mas manter no sistema Python
             # Chamar diretamente a função C para parar a thread
-            ret = self.c_lib.processor_stop_camera(camera_id)
+            ret = self._stop_camera_c(camera_id)
             
             if ret == 0:
                 # Marcar como desconectada, mas manter no sistema para reconexão
                 self._active_cameras[camera_id]["status"] = STATUS_DISCONNECTED
+                self._disconnected_cameras.add(camera_id)
                 logger.info(f"Câmera ID {camera_id} marcada como desconectada devido a falha. Será reconectada automaticamente.")
                 return True
             else:
@@ -804,6 +1451,122 @@ class CameraProcessor:
         # mas manter no sistema para reconexão automática
         return self.handle_camera_failure(camera_id, "Desconexão forçada para teste")
             
+    def get_status(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retira a atualização de status mais antiga ainda pendente.
+
+        Guarda até STATUS_QUEUE_MAXSIZE atualizações; quando o anel enche, as mais
+        antigas são descartadas. Pensado para um único consumidor.
+
+        Args:
+            timeout: Segundos de espera se não houver atualização (None = indefinido,
+                0 = não espera).
+
+        Returns:
+            dict com "camera_id", "status_code" e "message", ou None no timeout.
+        """
+        ring = self._status_ring
+        try:
+            return ring.popleft()
+        except IndexError:
+            pass
+        self._status_event.clear()
+        # Conferir de novo após limpar o evento: um append entre o popleft e o
+        # clear teria o set() apagado
+        try:
+            return ring.popleft()
+        except IndexError:
+            pass
+        if timeout is not None and timeout <= 0:
+            return None
+        if not self._status_event.wait(timeout):
+            return None
+        try:
+            return ring.popleft()
+        except IndexError:
+            return None
+
+    def get_status_batch(self) -> List[Dict[str, Any]]:
+        """
+        Retira de uma vez todas as atualizações de status pendentes, sem esperar.
+
+        Usa popleft item a item (atômico sob a GIL) em vez de list()+clear(), que
+        perderia um status anexado por uma thread C entre as duas chamadas.
+
+        Returns:
+            Lista (possivelmente vazia) de dicts no formato de get_status, em ordem.
+        """
+        ring = self._status_ring
+        popleft = ring.popleft
+        batch = [popleft() for _ in range(len(ring))]
+        if not ring:
+            self._status_event.clear()
+            # Um append entre o último popleft e o clear teria o set() apagado
+            if ring:
+                self._status_event.set()
+        return batch
+
+    def get_latest_frames(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Retorna o último frame recebido de cada câmera.
+
+        Os frames são views sem cópia do buffer C (exceto para callbacks com
+        wants_zero_copy=False): cada um segura um item do pool C enquanto houver
+        referência a ele. Guarde-os só pelo tempo necessário, ou copie com .copy().
+
+        Os dicts de cada câmera são os próprios publicados pela thread de consumo
+        (cada frame publica um dict novo, nunca altera um antigo): trate-os como
+        somente leitura. Sem lock e sem cópia por câmera.
+
+        Returns:
+            dict: {camera_id: {"frame", "pts", "timestamp", "width", "height"}}.
+            "timestamp" é o relógio de parede (time.time(), segundos desde a época)
+            no momento em que a thread de consumo recebeu o frame, comparável com
+            time.time(); não é monotônico nem derivado do pts.
+        """
+        latest_frames = self._latest_frames
+        # Só os slots das câmeras registradas (list() do dict é atômico), em vez de
+        # varrer os MAX_CAMERAS slots a cada chamada
+        result = {}
+        for cam_id in list(self._active_cameras):
+            info = latest_frames[cam_id]
+            if info is not None:
+                result[cam_id] = info
+        return result
+
+    def release_frame(self, camera_id: int) -> bool:
+        """
+        Solta a referência do processador ao último frame da câmera.
+
+        O item do pool C volta assim que o usuário também soltar o frame, sem
+        esperar o próximo frame da câmera sobrescrever o buffer de último frame.
+        Não há acesso posterior por get_latest_frames até chegar um frame novo.
+
+        Returns:
+            bool: True se havia um frame retido para a câmera.
+        """
+        if not 0 <= camera_id < MAX_CAMERAS or self._latest_frames[camera_id] is None:
+            return False
+        self._latest_frames[camera_id] = None
+        return True
+
+    def release_copy_buffer(self, camera_id: int, frame) -> bool:
+        """
+        Devolve ao anel da câmera um frame copiado (wants_zero_copy=False), para
+        ser reescrito por um frame seguinte. Só vale com copy_buffer_count > 0.
+
+        Depois de devolvido, o array não deve mais ser lido nem guardado, nem por
+        quem o obteve via get_latest_frames. O array publicado como último frame
+        da câmera nunca é reescrito enquanto continuar publicado.
+
+        Returns:
+            bool: True se o array era do anel da câmera e estava com o usuário.
+        """
+        if not 0 <= camera_id < MAX_CAMERAS:
+            return False
+        ring = self._copy_rings[camera_id]
+        return ring is not None and ring.release(frame)
+
     def get_camera_status(self, camera_id=None):
         """
         Retorna o status atual de uma câmera ou de todas as câmeras.
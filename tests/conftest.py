@@ -0,0 +1,235 @@
+"""
+Fixtures dos testes: uma biblioteca C falsa, em Python, no lugar da camera_pipeline_c.
+
+FakeCLibrary imita o contrato de c_src/src/camera_processor.c e callback_utils.c
+visto pelo Python: pool de itens CallbackFrameData com buffer próprio, fila de
+frames prontos consumida por processor_drain_frames e, no shutdown, buffers de
+itens ainda em uso deixados com o dono (liberados com callback_pool_free_buffer).
+Os testes empurram frames com push_frame, sem FFmpeg nem câmeras.
+"""
+
+import collections
+import ctypes
+import gc
+import threading
+import time
+
+import pytest
+
+from camera_pipeline.core import c_interface
+from camera_pipeline.core.c_interface import CallbackFrameData
+from camera_pipeline.core.constants import (
+    AV_PIX_FMT_BGR24,
+    AV_PIX_FMT_YUV420P,
+    STATUS_CONNECTING,
+    STATUS_STOPPED,
+)
+
+
+class FakeCLibrary:
+    """Imitação da biblioteca C com as funções de c_interface._C_FUNCTION_NAMES."""
+
+    def __init__(self):
+        self.initialized = False
+        self.initialize_calls = 0
+        self.shutdown_calls = 0
+        self.log_level = None
+        self.cameras = {}
+        # Itens fora do pool (na fila de prontos ou com o Python): endereço -> (struct, buffer)
+        self.in_use = {}
+        # Buffers de itens ainda em uso no shutdown: data_addr -> buffer
+        self.orphans = {}
+        self.returned = []
+        self.freed_buffers = []
+        self.invalid_returns = []
+        self._ready = collections.deque()
+        self._cond = threading.Condition()
+        self._messages = {}
+
+    # --- Processador ---
+
+    def logger_set_level(self, level):
+        self.log_level = level
+
+    def processor_initialize(self):
+        with self._cond:
+            if not self.initialized:
+                self.initialized = True
+                self.initialize_calls += 1
+            return 0
+
+    def processor_add_camera(self, camera_id, url, status_cb, frame_cb, status_user_data,
+                             frame_user_data, target_fps, pixel_format):
+        if not self.initialized:
+            return -1
+        if camera_id in self.cameras:
+            return -4
+        self.cameras[camera_id] = {
+            "url": url,
+            "status_cb": status_cb,
+            "target_fps": target_fps,
+            "pixel_format": pixel_format,
+        }
+        self.send_status(camera_id, STATUS_CONNECTING)
+        return 0
+
+    def processor_stop_camera(self, camera_id):
+        if not self.initialized:
+            return -1
+        camera = self.cameras.pop(camera_id, None)
+        if camera is None:
+            return -2
+        self._call_status(camera, camera_id, STATUS_STOPPED, b"Thread encerrada")
+        return 0
+
+    def processor_shutdown(self):
+        with self._cond:
+            if not self.initialized:
+                return -1
+            self.shutdown_calls += 1
+            self.cameras.clear()
+            # Itens na fila de prontos não têm dono fora do C: liberados com o pool
+            while self._ready:
+                self.in_use.pop(self._ready.popleft(), None)
+            # Os demais ficam com quem os segura
+            for item, buffer in self.in_use.values():
+                self.orphans[ctypes.addressof(buffer)] = buffer
+            self.in_use.clear()
+            self.initialized = False
+            self._cond.notify_all()
+        return 0
+
+    def processor_drain_frames(self, out_frames, out_headers, max_frames, timeout_ms):
+        with self._cond:
+            if self.initialized and not self._ready and timeout_ms > 0:
+                self._cond.wait(timeout_ms / 1000.0)
+            if not self.initialized:
+                return -1
+            count = 0
+            while self._ready and count < max_frames:
+                addr = self._ready.popleft()
+                out_frames[count] = addr
+                out_headers[count] = self.in_use[addr][0]
+                count += 1
+            return count
+
+    # --- Pool ---
+
+    def callback_pool_return_data(self, frame_addr):
+        with self._cond:
+            if not self.initialized:
+                return -1
+            if self.in_use.pop(frame_addr, None) is None:
+                self.invalid_returns.append(frame_addr)
+                return -2
+            self.returned.append(frame_addr)
+            return 0
+
+    def callback_pool_return_batch(self, items, count):
+        with self._cond:
+            if not self.initialized:
+                return -1
+            returned = 0
+            for addr in items[:count]:
+                if self.in_use.pop(addr, None) is None:
+                    self.invalid_returns.append(addr)
+                    continue
+                self.returned.append(addr)
+                returned += 1
+            return returned
+
+    def callback_pool_free_buffer(self, data_addr):
+        self.freed_buffers.append(data_addr)
+        self.orphans.pop(data_addr, None)
+
+    # --- Auxiliares dos testes ---
+
+    def send_status(self, camera_id, status_code, message=None):
+        """Chama o callback de status registrado, como update_camera_status no C."""
+        camera = self.cameras.get(camera_id)
+        if camera is not None:
+            self._call_status(camera, camera_id, status_code, message)
+
+    def _call_status(self, camera, camera_id, status_code, message):
+        message_ptr = None
+        if message is not None:
+            buffer = self._messages.setdefault(message, ctypes.create_string_buffer(message))
+            message_ptr = ctypes.addressof(buffer)
+        camera["status_cb"](camera_id, status_code, message_ptr, None)
+
+    def push_frame(self, camera_id, width=4, height=2, pixel_format=AV_PIX_FMT_BGR24,
+                   pts=0, linesize=None, fill=None):
+        """
+        Enfileira um frame como o C faria após a conversão. O conteúdo é fill ou,
+        sem ele, o padrão (i + pts) % 256 byte a byte. Retorna o endereço do item.
+        """
+        if pixel_format == AV_PIX_FMT_YUV420P:
+            linesize = width
+            size = width * height * 3 // 2
+        else:
+            linesize = linesize or width * 3
+            size = linesize * height
+        buffer = (ctypes.c_uint8 * size)()
+        for i in range(size):
+            buffer[i] = (i + pts) % 256 if fill is None else fill
+        item = CallbackFrameData()
+        item.width = width
+        item.height = height
+        item.format = pixel_format
+        item.pts = pts
+        item.camera_id = camera_id
+        item.ref_count = 1
+        item.data[0] = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+        item.linesize[0] = linesize
+        item.data_buffer_size[0] = size
+        addr = ctypes.addressof(item)
+        with self._cond:
+            self.in_use[addr] = (item, buffer)
+            self._ready.append(addr)
+            self._cond.notify_all()
+        return addr
+
+    def data_address(self, frame_addr):
+        """Endereço do buffer (data[0]) de um item ainda fora do pool."""
+        return ctypes.addressof(self.in_use[frame_addr][1])
+
+
+def wait_until(predicate, timeout=2.0):
+    """Espera predicate() ficar verdadeiro (as entregas rodam na thread de consumo)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    gc.collect()
+    return predicate()
+
+
+@pytest.fixture
+def fake_lib(monkeypatch):
+    """Instala FakeCLibrary como a biblioteca C carregada por c_interface."""
+    lib = FakeCLibrary()
+    monkeypatch.setattr(c_interface, "_loaded", True)
+    monkeypatch.setattr(c_interface, "_c_library", lib)
+    monkeypatch.setattr(c_interface, "_interface_ready", True)
+    for name in c_interface._C_FUNCTION_NAMES:
+        monkeypatch.setattr(c_interface, name, getattr(lib, name), raising=False)
+    return lib
+
+
+@pytest.fixture
+def make_processor(fake_lib):
+    """Cria CameraProcessor sobre fake_lib e garante o shutdown ao fim do teste."""
+    from camera_pipeline.core.processor import CameraProcessor
+
+    created = []
+
+    def factory(**kwargs):
+        kwargs.setdefault("auto_reconnect", False)
+        processor = CameraProcessor(**kwargs)
+        created.append(processor)
+        return processor
+
+    yield factory
+    for processor in created:
+        processor.shutdown()
@@ -0,0 +1,36 @@
+import ctypes
+
+from camera_pipeline.core.c_interface import (
+    CALLBACK_FRAME_HEADER,
+    CallbackFrameData,
+    _build_frame_header_struct,
+)
+
+
+def test_frame_header_struct_matches_ctypes_layout():
+    header = _build_frame_header_struct()
+    assert header.size == ctypes.sizeof(CallbackFrameData)
+    assert header.format == CALLBACK_FRAME_HEADER.format
+
+
+def test_frame_header_struct_unpacks_plane_zero():
+    buffer = (ctypes.c_uint8 * 64)()
+    item = CallbackFrameData()
+    item.width = 640
+    item.height = 480
+    item.format = 3
+    item.pts = -(2 ** 40)
+    item.camera_id = 7
+    item.ref_count = 1
+    item.data[0] = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+    item.data[1] = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+    item.linesize[0] = 1920
+    item.linesize[1] = 99
+    item.data_buffer_size[0] = 1920 * 480
+    item.data_buffer_size[1] = 1
+
+    fields = CALLBACK_FRAME_HEADER.unpack(ctypes.string_at(ctypes.addressof(item), ctypes.sizeof(item)))
+
+    assert fields == (
+        640, 480, 3, -(2 ** 40), 7, 1, ctypes.addressof(buffer), 1920, 1920 * 480,
+    )
@@ -0,0 +1,104 @@
+import logging
+
+import pytest
+
+from camera_pipeline.core import logging_config
+from camera_pipeline.core.logging_config import _MmapRingHandler, read_mmap_log
+
+
+def _ring(path, size=4096):
+    handler = _MmapRingHandler(str(path), size)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _emit(handler, message):
+    handler.emit(logging.makeLogRecord({"msg": message}))
+
+
+def test_ring_keeps_newest_records_in_order(tmp_path):
+    path = tmp_path / "camera_pipeline.ring"
+    handler = _ring(path)
+    for i in range(500):
+        _emit(handler, f"registro {i}")
+    handler.close()
+
+    records = read_mmap_log(str(path))
+    assert records[-1] == "registro 499"
+    first = int(records[0].split()[1])
+    # Só registros inteiros, consecutivos, sem o resto do registro sobrescrito
+    assert records == [f"registro {i}" for i in range(first, 500)]
+    assert path.stat().st_size == 4096
+
+
+def test_ring_resumes_from_persisted_head(tmp_path):
+    path = tmp_path / "camera_pipeline.ring"
+    handler = _ring(path)
+    _emit(handler, "antes")
+    handler.close()
+
+    handler = _ring(path)
+    _emit(handler, "depois\ncom traceback")
+    handler.close()
+
+    assert read_mmap_log(str(path)) == ["antes", "depois\ncom traceback"]
+
+
+def test_ring_refuses_regular_log_file(tmp_path):
+    path = tmp_path / "camera_pipeline.log"
+    path.write_text("log comum\n")
+    with pytest.raises(ValueError):
+        _ring(path)
+    assert path.read_text() == "log comum\n"
+
+
+@pytest.mark.parametrize("size", [0, 100])
+def test_ring_rejects_too_small_size(tmp_path, size):
+    with pytest.raises(ValueError):
+        _ring(tmp_path / "camera_pipeline.ring", size)
+
+
+def test_setup_logging_uses_dedicated_ring_file(tmp_path):
+    plain_log = tmp_path / "camera_pipeline.log"
+    plain_log.write_text("log comum\n")
+    try:
+        logging_config.setup_logging(
+            log_dir=str(tmp_path), log_to_console=False, max_bytes=4096, use_mmap_log=True
+        )
+        logging.getLogger("teste").info("no anel")
+    finally:
+        logging_config._stop_listener()
+        logging.getLogger().handlers.clear()
+
+    assert plain_log.read_text() == "log comum\n"
+    assert read_mmap_log(str(tmp_path / "camera_pipeline.ring"))[-1].endswith("no anel")
+
+
+def test_ring_keeps_nul_bytes_inside_records_across_wraps(tmp_path):
+    path = tmp_path / "camera_pipeline.ring"
+    handler = _ring(path)
+    _emit(handler, "primeiro")
+    handler.close()
+    # Antes da volta só o trecho escrito é lido, sem depender de bytes zerados
+    assert read_mmap_log(str(path)) == ["primeiro"]
+
+    handler = _ring(path)
+    messages = [f"bin\x00{i}\x00fim" for i in range(400)]
+    for message in messages:
+        _emit(handler, message)
+    handler.close()
+
+    records = read_mmap_log(str(path))
+    assert records[-1] == "bin\x00399\x00fim"
+    first = messages.index(records[0])
+    assert records == messages[first:]
+    assert first > 0  # o anel deu a volta
+
+
+def test_ring_recreates_ring_from_older_header(tmp_path):
+    path = tmp_path / "camera_pipeline.ring"
+    path.write_bytes(b"CPLRING1" + bytes(4088))
+    handler = _ring(path)
+    _emit(handler, "novo")
+    handler.close()
+    assert read_mmap_log(str(path)) == ["novo"]
@@ -0,0 +1,403 @@
+import gc
+import queue
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from camera_pipeline.core.callbacks import FrameCallback, RawBufferFrameCallback
+from camera_pipeline.core.constants import (
+    AV_PIX_FMT_BGR24,
+    AV_PIX_FMT_YUV420P,
+    STATUS_CONNECTED,
+    STATUS_CONNECTING,
+    STATUS_DISCONNECTED,
+    STATUS_ERROR,
+)
+from camera_pipeline.core.processor import _validate_frame
+
+from conftest import wait_until
+
+
+def _expected_bgr(width, height, pts=0):
+    raw = (np.arange(width * height * 3) + pts) % 256
+    return raw.astype(np.uint8).reshape(height, width, 3)
+
+
+class _Collector(FrameCallback):
+    def __init__(self, wants_zero_copy=True):
+        self.wants_zero_copy = wants_zero_copy
+        self.frames = []
+        self.threads = []
+
+    def process_frame(self, camera_id, frame):
+        self.frames.append((camera_id, frame))
+        self.threads.append(threading.current_thread().name)
+
+
+class _RawCollector(RawBufferFrameCallback):
+    def __init__(self, wants_zero_copy=True):
+        self.wants_zero_copy = wants_zero_copy
+        self.frames = []
+
+    def process_frame(self, camera_id, frame):
+        self.frames.append(frame)
+
+
+# --- _validate_frame ---
+
+@pytest.mark.parametrize(
+    "width, height, pixel_format, linesize, data_buffer_size, expected_size",
+    [
+        (4, 2, AV_PIX_FMT_BGR24, 12, 24, 24),
+        (4, 2, AV_PIX_FMT_YUV420P, 4, 12, 12),
+    ],
+)
+def test_validate_frame_accepts_valid_layouts(width, height, pixel_format, linesize,
+                                              data_buffer_size, expected_size):
+    assert _validate_frame(width, height, pixel_format, linesize, 1, data_buffer_size) == (
+        expected_size, None,
+    )
+
+
+@pytest.mark.parametrize(
+    "width, height, pixel_format, linesize, data_ptr, data_buffer_size",
+    [
+        (0, 2, AV_PIX_FMT_BGR24, 12, 1, 24),
+        (4, 2, AV_PIX_FMT_BGR24, 12, 0, 24),  # data[0] nulo
+        (4, 2, AV_PIX_FMT_BGR24, 11, 1, 22),  # linesize menor que width * 3
+        (4, 2, AV_PIX_FMT_BGR24, 16, 1, 32),  # o pool C nunca entrega linhas com padding
+        (3, 2, AV_PIX_FMT_YUV420P, 3, 1, 9),  # I420 exige dimensões pares
+        (4, 2, AV_PIX_FMT_YUV420P, 4, 1, 11),
+        (4, 2, 999, 12, 1, 24),
+    ],
+)
+def test_validate_frame_rejects_invalid_layouts(width, height, pixel_format, linesize,
+                                                data_ptr, data_buffer_size):
+    size, error = _validate_frame(width, height, pixel_format, linesize, data_ptr, data_buffer_size)
+    assert size == 0
+    assert error
+
+
+# --- Entrega de frames ---
+
+def test_zero_copy_frame_is_returned_when_last_reference_goes(make_processor, fake_lib):
+    processor = make_processor()
+    callback = _Collector()
+    assert processor.register_camera(1, "rtsp://cam1", callback) == 0
+
+    addr = fake_lib.push_frame(1, width=4, height=2, pts=3)
+    assert wait_until(lambda: callback.frames)
+    camera_id, frame = callback.frames.pop()
+
+    assert camera_id == 1
+    assert frame.shape == (2, 4, 3)
+    assert not frame.flags.owndata
+    np.testing.assert_array_equal(frame, _expected_bgr(4, 2, pts=3))
+    # Seguro pelo usuário e pelo buffer de último frame: ainda fora do pool
+    assert addr not in fake_lib.returned
+
+    assert processor.release_frame(1) is True
+    assert processor.release_frame(1) is False
+    gc.collect()
+    assert addr not in fake_lib.returned
+
+    del frame
+    gc.collect()
+    assert fake_lib.returned == [addr]
+
+
+def test_get_latest_frames_keeps_only_the_newest_frame(make_processor, fake_lib):
+    processor = make_processor()
+    assert processor.register_camera(
+        2, "rtsp://cam2", lambda camera_id, frame: None, pixel_format=AV_PIX_FMT_YUV420P
+    ) == 0
+
+    before = time.time()
+    first = fake_lib.push_frame(2, width=4, height=2, pixel_format=AV_PIX_FMT_YUV420P, pts=10)
+    second = fake_lib.push_frame(2, width=4, height=2, pixel_format=AV_PIX_FMT_YUV420P, pts=11)
+    assert wait_until(lambda: first in fake_lib.returned)
+
+    latest = processor.get_latest_frames()
+    assert list(latest) == [2]
+    info = latest[2]
+    assert (info["pts"], info["width"], info["height"]) == (11, 4, 2)
+    assert before <= info["timestamp"] <= time.time()
+    # I420: plano Y seguido de U e V em um único array (h * 3 // 2, w)
+    assert info["frame"].shape == (3, 4)
+    assert second not in fake_lib.returned
+
+    del latest, info
+    processor.release_frame(2)
+    gc.collect()
+    assert second in fake_lib.returned
+    assert processor.get_latest_frames() == {}
+
+
+def test_copy_mode_frames_are_owned_and_return_the_item(make_processor, fake_lib):
+    processor = make_processor()
+    callback = _Collector(wants_zero_copy=False)
+    assert processor.register_camera(3, "rtsp://cam3", callback) == 0
+
+    addr = fake_lib.push_frame(3, width=4, height=2, pts=1)
+    assert wait_until(lambda: addr in fake_lib.returned)
+
+    _, frame = callback.frames[0]
+    np.testing.assert_array_equal(frame, _expected_bgr(4, 2, pts=1))
+    frame[:] = 0  # memória própria: escrever não toca o buffer C
+    assert processor.get_latest_frames()[3]["frame"] is frame
+
+
+def test_copy_buffer_ring_reuses_only_released_arrays(make_processor, fake_lib):
+    processor = make_processor(copy_buffer_count=2)
+    callback = _Collector(wants_zero_copy=False)
+    assert processor.register_camera(3, "rtsp://cam3", callback) == 0
+
+    def deliver(pts):
+        count = len(callback.frames)
+        fake_lib.push_frame(3, pts=pts)
+        assert wait_until(lambda: len(callback.frames) > count)
+        return callback.frames[-1][1]
+
+    first = deliver(1)
+    second = deliver(2)
+    # Anel cheio e nada devolvido: array novo, fora do anel
+    third = deliver(3)
+    assert third is not first and third is not second
+    assert processor.release_copy_buffer(3, third) is False
+
+    assert processor.release_copy_buffer(3, first) is True
+    assert processor.release_copy_buffer(3, first) is False
+    assert deliver(4) is first
+    np.testing.assert_array_equal(first, _expected_bgr(4, 2, pts=4))
+    np.testing.assert_array_equal(second, _expected_bgr(4, 2, pts=2))
+
+    # O último frame publicado (first) não é reescrito mesmo devolvido
+    assert processor.release_copy_buffer(3, first) is True
+    assert processor.release_copy_buffer(3, second) is True
+    assert deliver(5) is second
+    assert processor.get_latest_frames()[3]["frame"] is second
+
+    # Outro shape recria o anel
+    fake_lib.push_frame(3, width=2, height=2)
+    assert wait_until(lambda: len(callback.frames) == 6)
+    assert processor.release_copy_buffer(3, second) is False
+
+
+def test_padded_bgr_frames_are_discarded(make_processor, fake_lib):
+    processor = make_processor()
+    callback = _Collector()
+    copied = _Collector(wants_zero_copy=False)
+    assert processor.register_camera(4, "rtsp://cam4", callback) == 0
+    assert processor.register_camera(5, "rtsp://cam5", copied) == 0
+
+    padded = fake_lib.push_frame(4, width=4, height=3, linesize=16)
+    padded_copy = fake_lib.push_frame(5, width=4, height=3, linesize=16)
+    assert wait_until(lambda: padded in fake_lib.returned and padded_copy in fake_lib.returned)
+    assert callback.frames == [] and copied.frames == []
+    assert processor.get_latest_frames() == {}
+
+
+def test_raw_buffer_callback_gets_memoryview_or_bytes(make_processor, fake_lib):
+    processor = make_processor()
+    zero_copy = _RawCollector()
+    copied = _RawCollector(wants_zero_copy=False)
+    assert processor.register_camera(5, "rtsp://cam5", zero_copy) == 0
+    assert processor.register_camera(6, "rtsp://cam6", copied) == 0
+
+    view_addr = fake_lib.push_frame(5, width=4, height=2)
+    copy_addr = fake_lib.push_frame(6, width=4, height=2)
+    assert wait_until(lambda: zero_copy.frames and copy_addr in fake_lib.returned)
+
+    view = zero_copy.frames.pop()
+    assert isinstance(view, memoryview)
+    assert view.format == "B" and view.nbytes == 24
+    assert bytes(view) == _expected_bgr(4, 2).tobytes()
+    assert copied.frames == [_expected_bgr(4, 2).tobytes()]
+
+    del view
+    processor.release_frame(5)
+    gc.collect()
+    assert view_addr in fake_lib.returned
+
+
+def test_frame_worker_threads_deliver_on_a_thread_per_camera(make_processor, fake_lib):
+    processor = make_processor(frame_worker_threads=True)
+    callback = _Collector()
+    assert processor.register_camera(7, "rtsp://cam7", callback) == 0
+
+    fake_lib.push_frame(7)
+    assert wait_until(lambda: callback.frames)
+    assert callback.threads == ["CameraFrameWorker-7"]
+
+    assert processor.stop_camera(7) is True
+    assert not any(t.name == "CameraFrameWorker-7" for t in threading.enumerate())
+
+
+def test_frames_of_unregistered_or_stopped_cameras_are_returned(make_processor, fake_lib):
+    processor = make_processor()
+    callback = _Collector()
+    assert processor.register_camera(8, "rtsp://cam8", callback) == 0
+    assert processor.stop_camera(8) is True
+
+    orphan = fake_lib.push_frame(9)
+    stopped = fake_lib.push_frame(8)
+    assert wait_until(lambda: orphan in fake_lib.returned and stopped in fake_lib.returned)
+    assert callback.frames == []
+
+
+# --- Status ---
+
+def test_status_updates_reach_callback_and_queue(make_processor, fake_lib):
+    processor = make_processor()
+    received = []
+    assert processor.register_camera(
+        1, "rtsp://cam1", _Collector(), status_callback=lambda *args: received.append(args)
+    ) == 0
+
+    fake_lib.send_status(1, STATUS_CONNECTED, b"Conectado")
+    fake_lib.send_status(1, STATUS_ERROR, b"Falha, nova tentativa em 5s")
+    fake_lib.send_status(1, STATUS_DISCONNECTED)
+
+    # O status emitido durante processor_add_camera só vai para a fila: o
+    # callback da câmera é registrado quando a chamada C retorna
+    assert received == [
+        (1, STATUS_CONNECTED, "Conectado"),
+        (1, STATUS_ERROR, "Falha, nova tentativa em 5s"),
+        (1, STATUS_DISCONNECTED, "Conexão perdida/finalizada"),
+    ]
+    assert processor.get_status(timeout=0) == {
+        "camera_id": 1, "status_code": STATUS_CONNECTING, "message": "Conectando...",
+    }
+    assert [processor.get_status(timeout=0)["status_code"] for _ in range(3)] == [
+        STATUS_CONNECTED, STATUS_ERROR, STATUS_DISCONNECTED,
+    ]
+    assert processor.get_status(timeout=0) is None
+    assert processor.get_camera_status(1)["status"] == STATUS_DISCONNECTED
+
+
+def test_get_status_waits_for_an_update(make_processor, fake_lib):
+    processor = make_processor()
+    assert processor.register_camera(1, "rtsp://cam1", _Collector()) == 0
+    assert processor.get_status(timeout=0)["status_code"] == STATUS_CONNECTING
+
+    timer = threading.Timer(0.05, fake_lib.send_status, (1, STATUS_CONNECTED))
+    timer.start()
+    try:
+        status = processor.get_status(timeout=2.0)
+    finally:
+        timer.join()
+    assert status["status_code"] == STATUS_CONNECTED
+    assert processor.get_status(timeout=0.01) is None
+
+
+def test_deprecated_status_queue_reads_the_status_ring(make_processor, fake_lib):
+    processor = make_processor()
+    assert processor.register_camera(1, "rtsp://cam1", _Collector()) == 0
+
+    with pytest.warns(DeprecationWarning):
+        status_queue = processor.status_queue
+    assert status_queue.qsize() == 1 and not status_queue.empty()
+    assert status_queue.get()["status_code"] == STATUS_CONNECTING
+    assert status_queue.empty()
+    with pytest.raises(queue.Empty):
+        status_queue.get_nowait()
+    with pytest.raises(queue.Empty):
+        status_queue.get(timeout=0.01)
+
+    fake_lib.send_status(1, STATUS_CONNECTED)
+    assert status_queue.get_nowait()["status_code"] == STATUS_CONNECTED
+    assert processor.get_status(timeout=0) is None
+
+
+def test_get_status_batch_drains_all_pending_updates(make_processor, fake_lib):
+    processor = make_processor()
+    assert processor.register_camera(1, "rtsp://cam1", _Collector()) == 0
+    fake_lib.send_status(1, STATUS_CONNECTED, b"Conectado")
+    fake_lib.send_status(1, STATUS_DISCONNECTED)
+
+    batch = processor.get_status_batch()
+    assert [s["status_code"] for s in batch] == [
+        STATUS_CONNECTING, STATUS_CONNECTED, STATUS_DISCONNECTED,
+    ]
+    assert batch[1]["message"] == "Conectado"
+    assert processor.get_status_batch() == []
+    assert processor.get_status(timeout=0) is None
+
+
+# --- Várias instâncias e shutdown ---
+
+def test_instances_share_the_processor_and_get_only_their_frames(make_processor, fake_lib):
+    first = make_processor()
+    second = make_processor()
+    first_frames = _Collector()
+    second_frames = _Collector()
+    assert first.register_camera(1, "rtsp://cam1", first_frames) == 0
+    assert second.register_camera(2, "rtsp://cam2", second_frames) == 0
+    # Slot já usado pela outra instância
+    assert second.register_camera(1, "rtsp://cam1", second_frames) == -4
+    assert second.stop_camera(1) is False
+
+    for pts in range(5):
+        fake_lib.push_frame(1, pts=pts)
+        fake_lib.push_frame(2, pts=pts)
+    assert wait_until(lambda: len(first_frames.frames) == 5 and len(second_frames.frames) == 5)
+    assert {cid for cid, _ in first_frames.frames} == {1}
+    assert {cid for cid, _ in second_frames.frames} == {2}
+    assert fake_lib.initialize_calls == 1
+    assert [t.name for t in threading.enumerate()].count("CameraFrameDrain") == 1
+
+    # A primeira instância sai: só as câmeras dela param, o processador C continua
+    first.shutdown()
+    assert fake_lib.shutdown_calls == 0
+    assert list(fake_lib.cameras) == [2]
+    fake_lib.push_frame(2, pts=99)
+    assert wait_until(lambda: len(second_frames.frames) == 6)
+
+    second.shutdown()
+    assert fake_lib.shutdown_calls == 1
+
+
+def test_frames_held_after_shutdown_stay_valid_until_released(make_processor, fake_lib):
+    processor = make_processor()
+    callback = _Collector()
+    raw = _RawCollector()
+    assert processor.register_camera(1, "rtsp://cam1", callback) == 0
+    assert processor.register_camera(2, "rtsp://cam2", raw) == 0
+
+    held = fake_lib.push_frame(1, pts=7)
+    held_raw = fake_lib.push_frame(2, pts=8)
+    held_data = fake_lib.data_address(held)
+    held_raw_data = fake_lib.data_address(held_raw)
+    assert wait_until(lambda: callback.frames and raw.frames)
+    _, frame = callback.frames.pop()
+    view = raw.frames.pop()
+
+    processor.shutdown()
+
+    # O pool foi destruído, mas os buffers em uso ficaram com quem os segura
+    assert set(fake_lib.orphans) == {held_data, held_raw_data}
+    np.testing.assert_array_equal(frame, _expected_bgr(4, 2, pts=7))
+    assert bytes(view) == _expected_bgr(4, 2, pts=8).tobytes()
+
+    del frame, view
+    gc.collect()
+    assert sorted(fake_lib.freed_buffers) == sorted([held_data, held_raw_data])
+    assert fake_lib.orphans == {}
+    # Nada foi devolvido a um pool inexistente
+    assert fake_lib.invalid_returns == []
+
+
+def test_processor_restarts_after_last_shutdown(make_processor, fake_lib):
+    first = make_processor()
+    assert first.register_camera(1, "rtsp://cam1", _Collector()) == 0
+    first.shutdown()
+    assert fake_lib.shutdown_calls == 1
+
+    second = make_processor()
+    callback = _Collector()
+    assert second.register_camera(1, "rtsp://cam1", callback) == 0
+    fake_lib.push_frame(1)
+    assert wait_until(lambda: callback.frames)
+    assert fake_lib.initialize_calls == 2